@@ -0,0 +1,138 @@
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+# 의미에 영향이 적은 표현은 정규화 시 제거 (날짜/시점처럼 답이 달라지는 말은 남긴다)
+filler_words = {
+    "좀", "한번", "혹시", "그럼", "그러면",
+    "어때", "어때요", "어떄", "알려줘", "알려주세요", "알려줄래", "말해줘", "말해주세요",
+    "해줘", "해주세요", "줘", "주세요", "부탁해", "볼래", "보여줘", "틀어줘", "틀어주세요",
+}
+
+punctuation_pattern = re.compile(r"[^\w\s]")
+digit_pattern = re.compile(r"\d+")
+
+# 답변 유형별 보관 시간(초): 1 BTV 검색, 2 날씨, 4 기타
+default_ttl_seconds = {
+    1: 24 * 60 * 60,
+    2: 10 * 60,
+    4: 60 * 60,
+}
+
+# 유사 질문 재사용을 허용하는 답변 유형 (LLM 자유 답변은 완전 일치만)
+similar_answer_types = {1, 2}
+
+
+def normalize_question(text: str):
+    text = unicodedata.normalize("NFC", f"{text}").lower()
+    text = punctuation_pattern.sub(" ", text)
+    tokens = [token for token in text.split() if token not in filler_words]
+    return "".join(tokens)
+
+
+def make_ngrams(text: str, n: int = 2):
+    if len(text) <= n:
+        return {text} if text else set()
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+class AnswerCache:
+    """
+    정규화한 질문의 완전 일치와 문자 n-gram 유사도로 이전 send_query 결과를 재사용하는 캐시
+    유사도 재사용은 similar_answer_types(BTV 검색, 날씨) 답변에만 적용하고,
+    숫자(회차, 날짜 등)가 다른 질문은 유사해도 같은 질문으로 보지 않는다
+    """
+
+    def __init__(self, similarity: float = 0.75, max_entries: int = 5000, ttl_seconds: dict = None):
+        self.similarity = similarity
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds or default_ttl_seconds
+        self.entries = OrderedDict()  # 정규화 질문 -> (만료 시각, message, answer_type, ngrams)
+        self.index = {}  # ngram -> {정규화 질문}
+        self.exact_hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, question: str):
+        key = normalize_question(question)
+        if not key:
+            return None
+
+        with self.lock:
+            now = time.monotonic()
+            entry = self.entries.get(key)
+            if entry and entry[0] > now:
+                self.entries.move_to_end(key)
+                self.exact_hits += 1
+                return entry[1], entry[2]
+            if entry:
+                self._remove(key)
+
+            similar_key = self._find_similar(key, now)
+            if similar_key:
+                self.entries.move_to_end(similar_key)
+                self.similar_hits += 1
+                entry = self.entries[similar_key]
+                return entry[1], entry[2]
+
+            self.misses += 1
+            return None
+
+    def put(self, question: str, message, answer_type: int):
+        key = normalize_question(question)
+        ttl = self.ttl_seconds.get(answer_type)
+        if not key or not ttl or not isinstance(message, str):
+            return
+
+        with self.lock:
+            if key in self.entries:
+                self._remove(key)
+            ngrams = make_ngrams(key) if answer_type in similar_answer_types else set()
+            self.entries[key] = (time.monotonic() + ttl, message, answer_type, ngrams)
+            for ngram in ngrams:
+                self.index.setdefault(ngram, set()).add(key)
+
+            while len(self.entries) > self.max_entries:
+                self._remove(next(iter(self.entries)))
+
+    def stats(self):
+        with self.lock:
+            return {
+                "entries": len(self.entries),
+                "exact_hits": self.exact_hits,
+                "similar_hits": self.similar_hits,
+                "misses": self.misses,
+            }
+
+    def _find_similar(self, key: str, now: float):
+        ngrams = make_ngrams(key)
+        digits = digit_pattern.findall(key)
+
+        counts = {}
+        for ngram in ngrams:
+            for candidate in self.index.get(ngram, ()):
+                counts[candidate] = counts.get(candidate, 0) + 1
+
+        best_key, best_score = None, 0
+        for candidate, shared in counts.items():
+            entry = self.entries[candidate]
+            if entry[0] <= now:
+                continue
+            if digit_pattern.findall(candidate) != digits:
+                continue
+            score = shared / (len(ngrams) + len(entry[3]) - shared)
+            if score >= self.similarity and score > best_score:
+                best_key, best_score = candidate, score
+        return best_key
+
+    def _remove(self, key: str):
+        entry = self.entries.pop(key)
+        for ngram in entry[3]:
+            keys = self.index.get(ngram)
+            if keys:
+                keys.discard(key)
+                if not keys:
+                    del self.index[ngram]
@@ -0,0 +1,73 @@
+import time
+from decimal import Decimal
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from golf_index import format_golf_hole
+from json_response import dumps_json, json_bytes_response
+
+# 홀 응답 생성 방식별 요청당 CPU 시간 비교
+# 사용법: python bench_golf_response.py
+
+iterations = 20000
+base_url = "http://localhost:8000"
+
+
+def make_hole_rows(course_id=1, hole_count=18):
+    return [
+        {
+            "course_id": course_id,
+            "hole_id": hole_id,
+            "hole_type": "OUT" if hole_id <= 9 else "IN",
+            "hole_number": hole_id,
+            "par_score": 4,
+            "hdcp": hole_id,
+            "back_tee": 380,
+            "champ_tee": 360,
+            "front_tee": 340,
+            "senior_tee": 320,
+            "lady_tee": 300,
+            "map_image_link": f"{base_url}/static/map/{course_id}_{hole_id}.png",
+            "map_video_link": f"{base_url}/static/map/{course_id}_{hole_id}.mp4",
+            "voice_file_name": f"{course_id}_{hole_id}.mp3",
+            "voice_text": f"{hole_id}번 홀은 파4 홀입니다. 페어웨이 왼쪽 벙커를 주의하세요.",
+            "tee_box_lat": Decimal("37.5665123"),
+            "tee_box_long": Decimal("126.9780123"),
+            "hole_cup_lat": Decimal("37.5670123"),
+            "hole_cup_long": Decimal("126.9790123"),
+        }
+        for hole_id in range(1, hole_count + 1)
+    ]
+
+
+def measure(name, func):
+    started = time.process_time()
+    for _ in range(iterations):
+        func()
+    elapsed = time.process_time() - started
+    print(f"{name:<40} {elapsed / iterations * 1_000_000:8.1f} us/request")
+
+
+if __name__ == "__main__":
+    rows = make_hole_rows()
+    hole_row = rows[0]
+
+    hole_body = dumps_json(format_golf_hole(hole_row, base_url))
+    holes_body = dumps_json({"result": "success", "list": [format_golf_hole(row, base_url) for row in rows]})
+
+    print(f"iterations={iterations}, hole={len(hole_body)} bytes, allholecup={len(holes_body)} bytes")
+
+    # 기존 방식: 요청마다 dict 생성 후 jsonable_encoder + JSONResponse 렌더링
+    measure("hole: dict + jsonable_encoder",
+            lambda: JSONResponse(jsonable_encoder(format_golf_hole(hole_row, base_url))))
+    measure("hole: pre-serialized bytes",
+            lambda: json_bytes_response(hole_body))
+
+    measure("allholecup: dict + jsonable_encoder",
+            lambda: JSONResponse(jsonable_encoder({
+                "result": "success",
+                "list": [format_golf_hole(row, base_url) for row in rows]
+            })))
+    measure("allholecup: pre-serialized bytes",
+            lambda: json_bytes_response(holes_body))
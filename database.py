@@ -0,0 +1,230 @@
+import asyncio
+import contextlib
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+
+import aiomysql
+import pymysql
+from pymysql.cursors import DictCursor
+from dbutils.pooled_db import PooledDB
+
+logger = logging.getLogger(__name__)
+
+# 커넥션 획득 대기 시간 히스토그램 구간(초)
+wait_buckets = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+
+
+class WaitHistogram:
+    def __init__(self):
+        self.counts = [0] * (len(wait_buckets) + 1)
+        self.count = 0
+        self.total = 0
+        self.max = 0
+        self.lock = threading.Lock()
+
+    def observe(self, seconds: float):
+        index = len(wait_buckets)
+        for i, bucket in enumerate(wait_buckets):
+            if seconds <= bucket:
+                index = i
+                break
+        with self.lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.total += seconds
+            self.max = max(self.max, seconds)
+
+    def snapshot(self):
+        with self.lock:
+            buckets = {f"le_{bucket * 1000:g}ms": count for bucket, count in zip(wait_buckets, self.counts)}
+            buckets["le_inf"] = self.counts[-1]
+            return {
+                "count": self.count,
+                "avg_ms": round(self.total / self.count * 1000, 2) if self.count else 0,
+                "max_ms": round(self.max * 1000, 2),
+                "buckets": buckets,
+            }
+
+
+def _find_caller():
+    # database.py / contextlib 밖의 첫 호출 위치
+    frame = sys._getframe(1)
+    while frame and frame.f_code.co_filename in (__file__, contextlib.__file__):
+        frame = frame.f_back
+    if frame is None:
+        return "unknown"
+    return f"{os.path.basename(frame.f_code.co_filename)}:{frame.f_code.co_name}:{frame.f_lineno}"
+
+
+class Database:
+    """
+    요청 핸들러용 비동기 풀(aiomysql)과 백그라운드 워커 스레드용 동기 풀(PooledDB)을 함께 관리
+    동기 풀은 워커 수만큼만 필요하므로 sync_maxsize 로 따로 작게 두고, 다 쓰이면 반환될 때까지 기다린다
+    커넥션은 cursor() / sync_cursor() 컨텍스트로만 사용해 반환 누락을 막고,
+    leak_threshold 초 넘게 반환되지 않은 커넥션은 누수 의심으로 보고한다
+    """
+
+    def __init__(self, host, port, user, password, db, minsize=2, maxsize=100, acquire_timeout=5,
+                 leak_threshold=30, sync_maxsize=8):
+        self.config = {
+            "host": host,
+            "port": int(port),
+            "user": user,
+            "password": password,
+            "db": db,
+        }
+        self.minsize = minsize
+        self.maxsize = maxsize
+        self.sync_maxsize = sync_maxsize
+        self.acquire_timeout = acquire_timeout
+        self.leak_threshold = leak_threshold
+
+        self.pool = PooledDB(
+            creator=pymysql,
+            maxconnections=sync_maxsize,
+            mincached=min(minsize, sync_maxsize),
+            blocking=True,
+            host=host,
+            port=int(port),
+            user=user,
+            password=password,
+            database=db,
+            charset='utf8mb4',
+            cursorclass=DictCursor
+        )
+        self.async_pool = None
+
+        self.async_wait = WaitHistogram()
+        self.sync_wait = WaitHistogram()
+        self.acquire_timeouts = 0
+        self.checkouts = {}  # token -> (풀 이름, 획득 시각, 호출 위치)
+        self.checkout_seq = 0
+        self.leak_reported = set()
+        self.lock = threading.Lock()
+
+    async def connect(self):
+        # 조회 후 트랜잭션이 열린 채 반환되지 않도록 autocommit 사용
+        self.async_pool = await aiomysql.create_pool(
+            minsize=self.minsize,
+            maxsize=self.maxsize,
+            charset='utf8mb4',
+            cursorclass=aiomysql.DictCursor,
+            autocommit=True,
+            **self.config
+        )
+
+    async def close(self):
+        if self.async_pool:
+            self.async_pool.close()
+            await self.async_pool.wait_closed()
+            self.async_pool = None
+
+    @asynccontextmanager
+    async def cursor(self):
+        started = time.perf_counter()
+        try:
+            connection = await asyncio.wait_for(self.async_pool.acquire(), self.acquire_timeout)
+        except asyncio.TimeoutError:
+            with self.lock:
+                self.acquire_timeouts += 1
+            raise
+        self.async_wait.observe(time.perf_counter() - started)
+        token = self._checkout("async")
+
+        try:
+            async with connection.cursor() as cursor:
+                yield cursor
+        finally:
+            self.async_pool.release(connection)
+            self._checkin(token)
+
+    @asynccontextmanager
+    async def transaction(self):
+        # 정상 종료 시 commit, 예외 발생 시 rollback
+        async with self.cursor() as cursor:
+            await cursor.connection.begin()
+            try:
+                yield cursor
+                await cursor.connection.commit()
+            except BaseException:
+                await cursor.connection.rollback()
+                raise
+
+    @contextmanager
+    def sync_cursor(self):
+        # 정상 종료 시 commit, 예외 발생 시 rollback
+        started = time.perf_counter()
+        connection = self.pool.connection()
+        self.sync_wait.observe(time.perf_counter() - started)
+        token = self._checkout("sync")
+
+        cursor = connection.cursor()
+        try:
+            yield cursor
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            cursor.close()
+            connection.close()
+            self._checkin(token)
+
+    def leaked_connections(self):
+        now = time.monotonic()
+        with self.lock:
+            leaked = [
+                {"pool": pool_name, "held_seconds": round(now - acquired_at, 1), "caller": caller}
+                for token, (pool_name, acquired_at, caller) in self.checkouts.items()
+                if now - acquired_at > self.leak_threshold
+            ]
+            new_tokens = [token for token, (_, acquired_at, _) in self.checkouts.items()
+                          if now - acquired_at > self.leak_threshold and token not in self.leak_reported]
+            self.leak_reported.update(new_tokens)
+
+        if new_tokens:
+            logger.warning(f"Possible DB connection leak: {leaked}")
+        return leaked
+
+    def stats(self):
+        with self.lock:
+            in_use = {"async": 0, "sync": 0}
+            for pool_name, _, _ in self.checkouts.values():
+                in_use[pool_name] += 1
+            acquire_timeouts = self.acquire_timeouts
+
+        return {
+            "async": {
+                "minsize": self.minsize,
+                "maxsize": self.maxsize,
+                "size": self.async_pool.size if self.async_pool else 0,
+                "in_use": in_use["async"],
+                "idle": self.async_pool.freesize if self.async_pool else 0,
+                "acquire_timeouts": acquire_timeouts,
+                "acquire_wait": self.async_wait.snapshot(),
+            },
+            "sync": {
+                "maxsize": self.sync_maxsize,
+                "in_use": in_use["sync"],
+                "idle": len(getattr(self.pool, "_idle_cache", [])),
+                "acquire_wait": self.sync_wait.snapshot(),
+            },
+            "leaked": self.leaked_connections(),
+        }
+
+    def _checkout(self, pool_name: str):
+        caller = _find_caller()
+        with self.lock:
+            self.checkout_seq += 1
+            token = self.checkout_seq
+            self.checkouts[token] = (pool_name, time.monotonic(), caller)
+        return token
+
+    def _checkin(self, token: int):
+        with self.lock:
+            self.checkouts.pop(token, None)
+            self.leak_reported.discard(token)
@@ -0,0 +1,119 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import threading
+
+from langchain_core.embeddings import Embeddings
+from langchain.prompts.example_selector import SemanticSimilarityExampleSelector
+from langchain_community.vectorstores import Chroma
+
+logger = logging.getLogger(__name__)
+
+collection_name = "sports_examples"
+ready_file_name = ".ready"
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    임베딩 결과를 sqlite 파일에 보관해 같은 문장은 임베딩 API 를 다시 호출하지 않는다
+    namespace 는 모델 이름처럼 벡터가 달라지는 기준으로 지정
+    """
+
+    def __init__(self, embeddings: Embeddings, path: str, namespace: str):
+        self.embeddings = embeddings
+        self.namespace = namespace
+        self.memory = {}
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("create table if not exists embedding (key text primary key, vector text)")
+        self.connection.commit()
+
+    def make_key(self, text: str):
+        return hashlib.sha256(f"{self.namespace}|{text}".encode("utf-8")).hexdigest()
+
+    def lookup(self, key: str):
+        with self.lock:
+            vector = self.memory.get(key)
+            if vector is None:
+                row = self.connection.execute("select vector from embedding where key = ?", (key,)).fetchone()
+                if row:
+                    vector = self.memory[key] = json.loads(row[0])
+            if vector is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return vector
+
+    def store(self, key: str, vector):
+        with self.lock:
+            self.memory[key] = vector
+            self.connection.execute("insert or replace into embedding (key, vector) values (?, ?)",
+                                    (key, json.dumps(vector)))
+            self.connection.commit()
+
+    def embed_documents(self, texts):
+        keys = [self.make_key(text) for text in texts]
+        vectors = [self.lookup(key) for key in keys]
+
+        missing = [i for i, vector in enumerate(vectors) if vector is None]
+        if missing:
+            for i, vector in zip(missing, self.embeddings.embed_documents([texts[i] for i in missing])):
+                self.store(keys[i], vector)
+                vectors[i] = vector
+        return vectors
+
+    def embed_query(self, text: str):
+        key = self.make_key(f"query|{text}")
+        vector = self.lookup(key)
+        if vector is None:
+            vector = self.embeddings.embed_query(text)
+            self.store(key, vector)
+        return vector
+
+    def stats(self):
+        with self.lock:
+            return {
+                "memory": len(self.memory),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+def examples_hash(examples, namespace: str = ""):
+    source = json.dumps([namespace, examples], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()[:16]
+
+
+def load_example_selector(examples, embeddings: Embeddings, directory: str, k: int = 1):
+    # directory/{예시 해시} 에 저장된 Chroma 인덱스가 있으면 그대로 읽고, 예시가 바뀐 경우에만 다시 만든다
+    index_directory = os.path.join(directory, examples_hash(examples, getattr(embeddings, "namespace", "")))
+    if os.path.exists(os.path.join(index_directory, ready_file_name)):
+        logger.info(f"Example index loaded: {index_directory}")
+        vectorstore = Chroma(collection_name=collection_name, embedding_function=embeddings,
+                             persist_directory=index_directory)
+        return SemanticSimilarityExampleSelector(vectorstore=vectorstore, k=k)
+
+    # 이전 예시로 만든 인덱스 정리
+    if os.path.isdir(directory):
+        for name in os.listdir(directory):
+            shutil.rmtree(os.path.join(directory, name), ignore_errors=True)
+
+    example_selector = SemanticSimilarityExampleSelector.from_examples(
+        examples,
+        embeddings,
+        Chroma,
+        k=k,
+        collection_name=collection_name,
+        persist_directory=index_directory
+    )
+    with open(os.path.join(index_directory, ready_file_name), "w") as f:
+        f.write(f"{len(examples)}")
+    logger.info(f"Example index built: {index_directory}, examples={len(examples)}")
+    return example_selector
@@ -0,0 +1,151 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from types import MappingProxyType
+
+logger = logging.getLogger(__name__)
+
+
+def format_golf_course(row):
+    return {
+        "course_id": row.get("course_id"),
+        "course_name": row.get("course_name"),
+        "total_hole_numbers": f"{row.get('total_hole_numbers')}홀",
+        "total_distance": f"{row.get('total_distance')}m",
+        "course_level": row.get("course_level"),
+        "green_level": row.get("green_level"),
+        "address": row.get("address"),
+        "homepage": row.get("homepage"),
+        "tel_no": row.get("tel_no"),
+    }
+
+
+def format_golf_hole(row, base_url: str):
+    return {
+        "result": "success",
+        "hole_type": row.get("hole_type"),
+        "hole_number": row.get("hole_number"),
+        "par_score": row.get("par_score"),
+        "hdcp": row.get("hdcp"),
+        "back_tee": f"{row.get('back_tee')}m",
+        "champ_tee": f"{row.get('champ_tee')}m",
+        "front_tee": f"{row.get('front_tee')}m",
+        "senior_tee": f"{row.get('senior_tee')}m",
+        "lady_tee": f"{row.get('lady_tee')}m",
+        "map_image_link": row.get("map_image_link"),
+        "map_video_link": row.get("map_video_link"),
+        "voice_text": row.get("voice_text"),
+        "voice_link": f"{base_url}/static/{row.get('voice_file_name')}",
+        "tee_box_lat": row.get("tee_box_lat"),
+        "tee_box_long": row.get("tee_box_long"),
+        "hole_cup_lat": row.get("hole_cup_lat"),
+        "hole_cup_long": row.get("hole_cup_long"),
+    }
+
+
+@dataclass(frozen=True, slots=True)
+class GolfCourseRecord:
+    course_id: int
+    version: str
+    weather_nx: int
+    weather_ny: int
+    payload: MappingProxyType
+    holes: tuple
+    holes_body: bytes
+
+
+class GolfIndex:
+    """
+    vr_golf_course / vr_golf_course_hole 전체를 메모리에 올려두고 골프장 API 를 메모리에서 처리
+    loader 는 (골프장 목록, 홀 목록) 을 반환하는 코루틴 함수이며, 갱신 시 인덱스 전체를 교체한다
+    serializer 를 지정하면 홀 응답을 직렬화된 bytes 로도 보관한다
+    """
+
+    def __init__(self, loader, base_url: str, serializer=None):
+        self.loader = loader
+        self.base_url = base_url
+        self.serializer = serializer
+        self.courses = {}  # course_id -> GolfCourseRecord
+        self.holes = {}  # (course_id, hole_id) -> 홀 응답
+        self.hole_bodies = {}  # (course_id, hole_id) -> 직렬화된 홀 응답
+        self.loaded_at = None
+        self.refresh_count = 0
+        self.refresh_lock = asyncio.Lock()
+
+    @property
+    def loaded(self):
+        return self.loaded_at is not None
+
+    async def refresh(self):
+        async with self.refresh_lock:
+            started = time.perf_counter()
+            course_rows, hole_rows = await self.loader()
+
+            hole_payloads = {}
+            hole_bodies = {}
+            course_holes = {}
+            hole_versions = {}
+            for row in hole_rows:
+                course_id = row.get("course_id")
+                payload = MappingProxyType(format_golf_hole(row, self.base_url))
+                hole_payloads[(course_id, row.get("hole_id"))] = payload
+                if self.serializer:
+                    hole_bodies[(course_id, row.get("hole_id"))] = self.serializer(payload)
+                course_holes.setdefault(course_id, []).append(payload)
+                hole_versions[course_id] = max(hole_versions.get(course_id, ""), f"{row.get('update_timestamp')}")
+
+            courses = {}
+            for row in course_rows:
+                course_id = row.get("course_id")
+                holes = tuple(course_holes.get(course_id, ()))
+                courses[course_id] = GolfCourseRecord(
+                    course_id=course_id,
+                    version=f"{row.get('update_timestamp')}|{hole_versions.get(course_id)}|{len(holes)}",
+                    weather_nx=row.get("weather_nx") or 62,
+                    weather_ny=row.get("weather_ny") or 120,
+                    payload=MappingProxyType(format_golf_course(row)),
+                    holes=holes,
+                    holes_body=self.serializer({"result": "success", "list": holes}) if self.serializer and holes else b"",
+                )
+
+            self.courses = courses
+            self.holes = hole_payloads
+            self.hole_bodies = hole_bodies
+            self.loaded_at = time.time()
+            self.refresh_count += 1
+            logger.info(f"Golf index refreshed: courses={len(courses)}, holes={len(hole_payloads)}, "
+                        f"{(time.perf_counter() - started) * 1000:.0f}ms")
+
+    async def ensure_loaded(self):
+        if not self.loaded:
+            await self.refresh()
+
+    async def run(self, interval_seconds: float):
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error(f"Error refresh golf index: {e}")
+
+    def get_course(self, course_id: int):
+        return self.courses.get(course_id)
+
+    def get_hole(self, course_id: int, hole_id: int):
+        return self.holes.get((course_id, hole_id))
+
+    def get_hole_body(self, course_id: int, hole_id: int):
+        return self.hole_bodies.get((course_id, hole_id))
+
+    async def weather_points(self):
+        await self.ensure_loaded()
+        return [(course.weather_nx, course.weather_ny) for course in self.courses.values()]
+
+    def stats(self):
+        return {
+            "courses": len(self.courses),
+            "holes": len(self.holes),
+            "loaded_at": self.loaded_at,
+            "refresh_count": self.refresh_count,
+        }
@@ -0,0 +1,108 @@
+import re
+import threading
+
+# 날씨 질의에서 찾을 도시 (OpenWeatherMap 검색명)
+city_names = {
+    "서울": "Seoul",
+    "부산": "Busan",
+    "인천": "Incheon",
+    "대구": "Daegu",
+    "대전": "Daejeon",
+    "광주": "Gwangju",
+    "울산": "Ulsan",
+    "세종": "Sejong",
+    "수원": "Suwon",
+    "성남": "Seongnam",
+    "고양": "Goyang",
+    "용인": "Yongin",
+    "청주": "Cheongju",
+    "전주": "Jeonju",
+    "천안": "Cheonan",
+    "포항": "Pohang",
+    "창원": "Changwon",
+    "춘천": "Chuncheon",
+    "강릉": "Gangneung",
+    "원주": "Wonju",
+    "여수": "Yeosu",
+    "목포": "Mokpo",
+    "제주": "Jeju",
+}
+
+# 도시 이름은 단어 전체로만 찾는다 (뒤에 시/조사만 허용, "고양이", "원주민", "대구탕" 은 제외)
+city_pattern = re.compile(r"(?<![가-힣])(" + "|".join(city_names) +
+                          r")(?:특별시|광역시|시)?(?:의|은|는|에|에서|도)?(?![가-힣])")
+
+# 온도/우산처럼 날씨 외에도 쓰이는 말은 제외
+weather_pattern = re.compile(r"날씨|기온|(비|눈)\s*(가|이)?\s*(와|오|올|내리)")
+# BTV 검색은 매체 명사와 재생/검색 동사가 함께 있을 때만 규칙으로 처리 (동사만 있으면 LLM 으로)
+media_noun_pattern = re.compile(r"드라마|영화|예능|다큐|애니|채널|방송|회차|시즌|다시\s*보기|vod|btv", re.IGNORECASE)
+media_verb_pattern = re.compile(r"틀어|보여\s*줘|재생|검색|찾아\s*줘|보고\s*싶|볼래")
+
+
+class IntentRouter:
+    """
+    규칙 기반으로 명확한 날씨/BTV 검색 질의를 판별해 함수 호출 LLM 왕복을 생략한다
+    classifier 는 (함수명, 신뢰도) 를 반환하는 선택적 로컬 모델이며 threshold 이상일 때만 사용한다
+    """
+
+    def __init__(self, classifier=None, threshold: float = 0.8):
+        self.classifier = classifier
+        self.threshold = threshold
+        self.counters = {
+            "rule_weather": 0,
+            "rule_media": 0,
+            "model": 0,
+            "fallback": 0,
+        }
+        self.lock = threading.Lock()
+
+    def route(self, text: str):
+        text = text.strip()
+        is_weather = bool(weather_pattern.search(text))
+        is_media = bool(media_noun_pattern.search(text)) and bool(media_verb_pattern.search(text))
+
+        if is_weather and not is_media:
+            city = self._find_city(text)
+            if city:
+                self._count("rule_weather")
+                return "current_weather_info", {"city": city}
+
+        if is_media and not is_weather:
+            self._count("rule_media")
+            return "search_media_keywords", {"sentence": text}
+
+        if self.classifier:
+            function_name, confidence = self.classifier(text)
+            if function_name and confidence >= self.threshold:
+                arguments = {"sentence": text}
+                if function_name == "current_weather_info":
+                    city = self._find_city(text)
+                    arguments = {"city": city} if city else None
+                if arguments:
+                    self._count("model")
+                    return function_name, arguments
+
+        self._count("fallback")
+        return None
+
+    def stats(self):
+        with self.lock:
+            routed = self.counters["rule_weather"] + self.counters["rule_media"] + self.counters["model"]
+            total = routed + self.counters["fallback"]
+            return {
+                **self.counters,
+                "total": total,
+                "llm_calls_saved": routed,
+                "hit_rate": round(routed / total, 4) if total else 0,
+            }
+
+    def _count(self, name: str):
+        with self.lock:
+            self.counters[name] += 1
+
+    @staticmethod
+    def _find_city(text: str):
+        found = {match.group(1) for match in city_pattern.finditer(text)}
+        if len(found) == 1:
+            return city_names[found.pop()]
+        return None
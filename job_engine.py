@@ -0,0 +1,84 @@
+import asyncio
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFullError(Exception):
+    pass
+
+
+class JobEngine:
+    """
+    고정 개수의 asyncio 워커와 크기 제한 큐로 작업을 처리하는 엔진
+    동기 함수는 전용 스레드풀에서 실행되어 요청 처리 스레드풀을 점유하지 않는다
+    """
+
+    def __init__(self, name: str, worker_count: int, queue_size: int):
+        self.name = name
+        self.worker_count = worker_count
+        self.queue_size = queue_size
+        self.queue = None
+        self.executor = None
+        self.workers = []
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+
+    async def start(self):
+        self.queue = asyncio.Queue(maxsize=self.queue_size)
+        self.executor = ThreadPoolExecutor(max_workers=self.worker_count, thread_name_prefix=self.name)
+        for index in range(self.worker_count):
+            self.workers.append(asyncio.create_task(self._worker(index)))
+        logger.info(f"{self.name} job engine started: workers={self.worker_count}, queue_size={self.queue_size}")
+
+    async def stop(self):
+        for worker in self.workers:
+            worker.cancel()
+        await asyncio.gather(*self.workers, return_exceptions=True)
+        self.workers = []
+        if self.executor:
+            self.executor.shutdown(wait=False)
+        logger.info(f"{self.name} job engine stopped")
+
+    def submit(self, func, *args):
+        if self.queue is None:
+            raise RuntimeError(f"{self.name} job engine is not started")
+        try:
+            self.queue.put_nowait((func, args))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise QueueFullError(f"{self.name} queue is full ({self.queue_size})")
+
+    def stats(self):
+        return {
+            "name": self.name,
+            "workers": self.worker_count,
+            "queue_size": self.queue_size,
+            "queue_depth": self.queue.qsize() if self.queue else 0,
+            "running": self.running,
+            "completed": self.completed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+        }
+
+    async def _worker(self, index: int):
+        loop = asyncio.get_running_loop()
+        while True:
+            func, args = await self.queue.get()
+            self.running += 1
+            try:
+                if asyncio.iscoroutinefunction(func):
+                    await func(*args)
+                else:
+                    await loop.run_in_executor(self.executor, functools.partial(func, *args))
+                self.completed += 1
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"{self.name} worker {index} job error: {e}")
+            finally:
+                self.running -= 1
+                self.queue.task_done()
@@ -0,0 +1,44 @@
+import gzip
+import json
+import os
+import tempfile
+
+
+def dumps_json_file(data, pretty: bool = False):
+    if pretty:
+        return json.dumps(data, ensure_ascii=False, indent=2).encode("utf-8")
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def write_atomic(path: str, body: bytes):
+    # 같은 디렉터리의 임시 파일에 쓴 뒤 rename 하므로 읽는 쪽은 항상 완성된 파일만 본다
+    fd, temp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix=".tmp",
+                                     dir=os.path.dirname(path) or ".")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(body)
+        os.chmod(temp_path, 0o644)
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def write_json_file(path: str, data, pretty: bool = False, compress: bool = False):
+    """
+    JSON 을 기본은 공백 없이 직렬화해 원자적으로 저장
+    compress 면 {path}.gz 도 함께 저장하며, 본 파일을 먼저 바꾸고 .gz 를 나중에 바꾼다
+    (.gz 의 mtime 이 본 파일보다 같거나 늦을 때만 같은 버전으로 본다)
+    """
+    body = dumps_json_file(data, pretty)
+    write_atomic(path, body)
+
+    gzip_path = f"{path}.gz"
+    if compress:
+        write_atomic(gzip_path, gzip.compress(body, compresslevel=9, mtime=0))
+    elif os.path.exists(gzip_path):
+        os.remove(gzip_path)
+    return body
@@ -0,0 +1,34 @@
+import json
+from collections.abc import Mapping
+from datetime import date, datetime
+from decimal import Decimal
+
+from starlette.responses import Response
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _default(obj):
+    # jsonable_encoder 와 같은 방식으로 변환
+    if isinstance(obj, Mapping):
+        return dict(obj)
+    if isinstance(obj, Decimal):
+        return int(obj) if obj.as_tuple().exponent >= 0 else float(obj)
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps_json(content):
+    # orjson 이 설치되어 있으면 사용, 없으면 표준 json 으로 JSONResponse 와 같은 형식 생성
+    if orjson:
+        return orjson.dumps(content, default=_default)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":"), default=_default).encode("utf-8")
+
+
+def json_bytes_response(body: bytes, status_code: int = 200, headers: dict = None):
+    # 미리 직렬화된 JSON 을 jsonable_encoder 를 거치지 않고 그대로 반환
+    return Response(content=body, status_code=status_code, headers=headers, media_type="application/json")
@@ -1,18 +1,36 @@
 import os
+import asyncio
 import logging
-import pymysql
 import requests
 import json
+import hashlib
+import tempfile
+import time
+import random
 from datetime import datetime, timedelta
 from pydantic import BaseModel
-from pymysql.cursors import DictCursor
-from dbutils.pooled_db import PooledDB
-from fastapi import FastAPI, BackgroundTasks, File, UploadFile
+from requests.adapters import HTTPAdapter
+from fastapi import FastAPI, BackgroundTasks, File, Request, UploadFile, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from starlette.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse, Response, StreamingResponse
 from openai import OpenAI
 from dotenv import load_dotenv
+from job_engine import JobEngine, QueueFullError
+from tts_cache import TtsCache
+from result_broker import ResultBroker
+from intent_router import IntentRouter
+from answer_cache import AnswerCache
+from weather_cache import ForecastCache, get_ultra_short_base_datetime, get_ultra_short_base_time
+from weather_prefetcher import WeatherPrefetcher
+from database import Database
+from ttl_cache import TtlCache
+from golf_index import GolfIndex
+from json_response import dumps_json, json_bytes_response
+from sports_cache import SportsFileCache, etag_matches
+from sports_watcher import SportsTimelineWatcher
+import repository
 
 # .env 설정 불러오기
 load_dotenv()
@@ -57,30 +75,115 @@ edenai_api_key = os.getenv("EDENAI_API_KEY")
 # 서버 URL
 app_url = os.getenv("APP_URL")
 
+# 정적 파일 위치
+static_folder = os.getenv("STATIC_FOLDER")
 
-class Database:
-    def __init__(self, host, port, user, password, db):
-        self.pool = PooledDB(
-            creator=pymysql,
-            maxconnections=100,
-            mincached=2,
-            host=host,
-            port=int(port),
-            user=user,
-            password=password,
-            database=db,
-            charset='utf8mb4',
-            cursorclass=DictCursor
-        )
+# TTS 캐시 설정
+tts_cache_max_bytes = int(os.getenv("TTS_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+tts_cache_max_files = int(os.getenv("TTS_CACHE_MAX_FILES", "10000"))
+
+# STT 작업 엔진 설정
+stt_worker_count = int(os.getenv("STT_WORKER_COUNT", "4"))
+stt_queue_size = int(os.getenv("STT_QUEUE_SIZE", "100"))
+
+# DB 풀 설정
+mysql_pool_min = int(os.getenv("MYSQL_POOL_MIN", "2"))
+mysql_pool_max = int(os.getenv("MYSQL_POOL_MAX", "100"))
+mysql_acquire_timeout = float(os.getenv("MYSQL_ACQUIRE_TIMEOUT", "5"))
+# 동기 풀(STT/TTS 워커 스레드 전용) 최대 커넥션 수, 두 풀의 합이 MySQL max_connections 를 넘지 않게 작게 둔다
+mysql_sync_pool_max = int(os.getenv("MYSQL_SYNC_POOL_MAX", str(stt_worker_count + 4)))
+
+# 업로드 설정
+upload_chunk_size = int(os.getenv("UPLOAD_CHUNK_SIZE", str(1024 * 1024)))
+upload_max_bytes = int(os.getenv("UPLOAD_MAX_BYTES", str(25 * 1024 * 1024)))
+
+# 날씨 예보 선갱신 설정
+weather_refresh_ahead = os.getenv("WEATHER_REFRESH_AHEAD", "true").lower() == "true"
+
+# 골프장 날씨 일괄 수집 설정
+weather_prefetch = os.getenv("WEATHER_PREFETCH", "true").lower() == "true"
+weather_prefetch_workers = int(os.getenv("WEATHER_PREFETCH_WORKERS", "8"))
+
+# TTS 점유 후 수신완료 대기 시간(초), 지나면 다른 소비자에게 다시 전달
+tts_claim_timeout = int(os.getenv("TTS_CLAIM_TIMEOUT", "60"))
+
+# 골프장 홀/경기 요약 응답을 미리 직렬화된 bytes 로 반환
+preserialized_responses = os.getenv("PRESERIALIZED_RESPONSES", "true").lower() == "true"
+
+# 경기 요약 파일 변경 확인 주기(초)
+sports_file_check_interval = float(os.getenv("SPORTS_FILE_CHECK_INTERVAL", "1"))
+
+# 골프장 인덱스 갱신 주기(초)
+golf_index_refresh_seconds = int(os.getenv("GOLF_INDEX_REFRESH_SECONDS", "300"))
+
+# 결과 푸시 대기 시간(초)
+result_push_timeout = int(os.getenv("RESULT_PUSH_TIMEOUT", "60"))
+
+# STT 파이프라인 단계별 재시도 횟수와 첫 재시도 대기 시간(초, 시도마다 2배)
+stt_stage_retries = int(os.getenv("STT_STAGE_RETRIES", "2"))
+stt_retry_backoff = float(os.getenv("STT_RETRY_BACKOFF", "1"))
+
+
+db = Database(mysql_ip, mysql_port, mysql_id, mysql_passwd, mysql_db,
+              mysql_pool_min, mysql_pool_max, mysql_acquire_timeout, sync_maxsize=mysql_sync_pool_max)
+
+stt_engine = JobEngine("stt", stt_worker_count, stt_queue_size)
+
+result_broker = ResultBroker()
+
+# 전달 완료된 /api/ai/result 응답
+completed_results = TtlCache(10000, 10 * 60)
 
-    def get_connection(self):
-        return self.pool.connection()
+intent_router = IntentRouter()
 
+answer_cache = AnswerCache()
 
-db = Database(mysql_ip, mysql_port, mysql_id, mysql_passwd, mysql_db)
+forecast_cache = ForecastCache(lambda *key: fetch_korea_weather(*key))
 
+# 기상청 API 호출용 연결 풀
+weather_session = requests.Session()
+weather_session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=weather_prefetch_workers))
 
-app.mount("/static", StaticFiles(directory=os.getenv("STATIC_FOLDER")), name="static")
+# 골프장 정보 메모리 인덱스
+golf_index = GolfIndex(lambda: repository.load_golf_index(db), app_url,
+                       dumps_json if preserialized_responses else None)
+
+weather_prefetcher = WeatherPrefetcher(forecast_cache, golf_index.weather_points, weather_prefetch_workers)
+
+sports_files = SportsFileCache(voice_folder, sports_file_check_interval)
+sports_timeline_watcher = SportsTimelineWatcher(sports_files, sports_file_check_interval)
+
+tts_cache = TtsCache(os.path.join(static_folder, "tts"), app_url, tts_cache_max_bytes, tts_cache_max_files)
+
+
+@app.on_event("startup")
+async def start_job_engine():
+    await db.connect()
+    await stt_engine.start()
+    try:
+        await golf_index.refresh()
+    except Exception as e:
+        logger.error(f"Error load golf index: {e}")
+    app.state.golf_index_task = asyncio.create_task(golf_index.run(golf_index_refresh_seconds))
+    if weather_refresh_ahead:
+        app.state.weather_refresh_task = asyncio.create_task(forecast_cache.refresh_loop())
+    if weather_prefetch:
+        app.state.weather_prefetch_task = asyncio.create_task(weather_prefetcher.run())
+
+
+@app.on_event("shutdown")
+async def stop_job_engine():
+    await stt_engine.stop()
+    await sports_timeline_watcher.stop()
+    app.state.golf_index_task.cancel()
+    if weather_refresh_ahead:
+        app.state.weather_refresh_task.cancel()
+    if weather_prefetch:
+        app.state.weather_prefetch_task.cancel()
+    await db.close()
+
+
+app.mount("/static", StaticFiles(directory=static_folder), name="static")
 
 
 ################################################
@@ -92,25 +195,139 @@ async def root():
     return {"message": "Hello World"}
 
 
+class UploadTooLargeError(Exception):
+    pass
+
+
+def submit_stt_job(audio_source, voice_file_name: str):
+    # STT 작업 엔진에 음성 파일 STT 작업 등록
+    try:
+        stt_engine.submit(get_ai_stt, audio_source, voice_file_name)
+        return None
+    except QueueFullError as e:
+        logger.error(f"STT queue full: {e}")
+        return JSONResponse(status_code=429, content={
+            "result": "fail",
+            "type": "error",
+            "text": "요청이 많아 잠시 후 다시 시도해주세요."
+        })
+
+
+def stt_listen_response(voice_file_name: str):
+    return {
+        "TYPE": "request",
+        "COMMAND": "controlAvatar",
+        "CONTENTS": "",
+        "DATA": {
+            "status": "listen",
+            "key": voice_file_name
+        }
+    }
+
+
+def open_temp_file(file_path: str):
+    # 같은 이름의 파일을 동시에 받아도 겹치지 않도록 대상 폴더에 고유한 임시 파일 생성
+    fd, temp_path = tempfile.mkstemp(prefix=f".{os.path.basename(file_path)}.", suffix=".part",
+                                     dir=os.path.dirname(file_path) or ".")
+    os.chmod(temp_path, 0o644)
+    return os.fdopen(fd, "wb"), temp_path
+
+
+def remove_temp_file(temp_path: str):
+    try:
+        os.remove(temp_path)
+    except FileNotFoundError:
+        pass
+
+
+class UploadSizeLimitMiddleware:
+    """
+    Content-Length 가 있는 업로드 요청은 본문을 받기 전에 크기를 확인해 413 으로 거절
+    Content-Length 가 없으면 save_upload_file 에서 읽으며 확인한다
+    """
+
+    # 파일 외 multipart 헤더/경계 문자열에 허용하는 여유
+    form_overhead = 64 * 1024
+
+    def __init__(self, app, paths, max_bytes: int):
+        self.app = app
+        self.paths = set(paths)
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["method"] == "POST" and scope["path"] in self.paths:
+            content_length = dict(scope["headers"]).get(b"content-length", b"")
+            if content_length.isdigit() and int(content_length) > self.max_bytes + self.form_overhead:
+                response = JSONResponse(status_code=413, content={
+                    "message": f"Could not upload the file: file exceeds {self.max_bytes} bytes"
+                })
+                await response(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
+
+
+app.add_middleware(UploadSizeLimitMiddleware, paths=["/api/upload/", "/api/ai/stt/"], max_bytes=upload_max_bytes)
+
+
+async def save_upload_file(file: UploadFile, file_path: str):
+    # 임시 파일에 큰 단위로 기록한 뒤 완료되면 원자적으로 교체
+    total_bytes = 0
+    buffer, temp_path = await run_in_threadpool(open_temp_file, file_path)
+    try:
+        while True:
+            chunk = await file.read(upload_chunk_size)
+            if not chunk:
+                break
+            total_bytes += len(chunk)
+            if total_bytes > upload_max_bytes:
+                raise UploadTooLargeError(f"file exceeds {upload_max_bytes} bytes")
+            await run_in_threadpool(buffer.write, chunk)
+        await run_in_threadpool(buffer.close)
+        await run_in_threadpool(os.replace, temp_path, file_path)
+    except Exception:
+        await run_in_threadpool(buffer.close)
+        await run_in_threadpool(remove_temp_file, temp_path)
+        raise
+    return total_bytes
+
+
 @app.post("/api/upload/")
-async def upload_file(file: UploadFile = File(...)):
+async def upload_file(file: UploadFile = File(...), auto_stt: bool = False):
     try:
-        file_path = os.path.join(voice_folder, file.filename)
-        with open(file_path, "wb") as buffer:
-            while True:
-                chunk = file.file.read(1024)  # 1024 바이트씩 읽기
-                if not chunk:
-                    break
-                buffer.write(chunk)
-
-        return {"filename": file.filename, "message": "File uploaded successfully"}
+        file_name = os.path.basename(file.filename)
+        file_path = os.path.join(voice_folder, file_name)
+
+        started = time.perf_counter()
+        total_bytes = await save_upload_file(file, file_path)
+        elapsed = time.perf_counter() - started
+        throughput = total_bytes / elapsed / (1024 * 1024) if elapsed > 0 else 0
+        logger.info(f"Upload complete: {file_name}, {total_bytes} bytes, {elapsed * 1000:.0f}ms, {throughput:.2f}MB/s")
+
+        result = {
+            "filename": file_name,
+            "message": "File uploaded successfully",
+            "size": total_bytes,
+            "elapsed_ms": round(elapsed * 1000),
+            "throughput_mbps": round(throughput, 2)
+        }
+
+        # 업로드 완료 후 바로 STT 작업 시작
+        if auto_stt:
+            error_response = submit_stt_job(file_path, file_name)
+            if error_response:
+                return error_response
+            result["stt"] = stt_listen_response(file_name)
+
+        return result
+    except UploadTooLargeError as e:
+        return JSONResponse(status_code=413, content={"message": f"Could not upload the file: {e}"})
     except Exception as e:
         return JSONResponse(status_code=400, content={"message": f"Could not upload the file: {e}"})
 
 
 # 파일 업로드 및 STT 처리를 위한 엔드포인트
 @app.get("/api/ai/stt/{voice_file_name}")
-async def speech_to_text(background_tasks: BackgroundTasks, voice_file_name: str):
+async def speech_to_text(voice_file_name: str):
     audio_file_path = os.path.join(voice_folder, voice_file_name)
     if not os.path.exists(audio_file_path):
         logger.error(f"File not found: {audio_file_path}")
@@ -120,97 +337,117 @@ async def speech_to_text(background_tasks: BackgroundTasks, voice_file_name: str
             "text": "음성 파일 찾기에 실패했습니다."
         }
 
-    # 백그라운드로 음성 파일 STT 작업 시작
-    background_tasks.add_task(get_ai_stt, audio_file_path, voice_file_name)
+    error_response = submit_stt_job(audio_file_path, voice_file_name)
+    if error_response:
+        return error_response
+
+    return stt_listen_response(voice_file_name)
 
+
+# 파일 업로드와 STT 처리를 한 번에 수행하는 엔드포인트
+@app.post("/api/ai/stt/")
+async def upload_speech_to_text(file: UploadFile = File(...)):
+    voice_file_name = os.path.basename(file.filename)
+    audio_file_path = os.path.join(voice_folder, voice_file_name)
+    try:
+        # 음성 데이터를 메모리에 모아 두지 않고 파일로 저장한 뒤 경로만 STT 큐에 넘긴다
+        await save_upload_file(file, audio_file_path)
+    except UploadTooLargeError as e:
+        return JSONResponse(status_code=413, content={"message": f"Could not upload the file: {e}"})
+    except Exception as e:
+        return JSONResponse(status_code=400, content={"message": f"Could not upload the file: {e}"})
+
+    error_response = submit_stt_job(audio_file_path, voice_file_name)
+    if error_response:
+        return error_response
+
+    return stt_listen_response(voice_file_name)
+
+
+@app.get("/api/ai/queue")
+async def get_ai_queue():
     return {
-        "TYPE": "request",
-        "COMMAND": "controlAvatar",
-        "CONTENTS": "",
-        "DATA": {
-            "status": "listen",
-            "key": voice_file_name
-        }
+        "result": "success",
+        "stt": stt_engine.stats(),
+        "tts_cache": tts_cache.stats(),
+        "result_broker": result_broker.stats(),
+        "intent_router": intent_router.stats(),
+        "answer_cache": answer_cache.stats(),
+        "forecast_cache": forecast_cache.stats(),
+        "weather_prefetcher": weather_prefetcher.stats(),
+        "db": db.stats(),
+        "completed_results": completed_results.stats(),
+        "golf_index": golf_index.stats(),
+        "sports_files": sports_files.stats(),
+        "sports_timeline_watcher": sports_timeline_watcher.stats()
+    }
+
+
+@app.get("/metrics")
+async def get_metrics():
+    return {
+        "db": db.stats(),
+        "stt": stt_engine.stats()
     }
 
 
 @app.get("/api/ai/result/{voice_file_name}")
-def get_ai_keyword(voice_file_name: str):
-    connection = db.get_connection()
-    cursor = connection.cursor()
-    try:
-        cursor.execute("""
-            select
-                voice_file_name,
-                client_stt_question,
-                case 
-                    when answer_type = 1 then 'btv-search'
-                    when answer_type = 2 then 'weather' 
-                    else 'ai-answer' 
-                end answer_type,
-                ai_chat_answer,
-                insert_user,
-                insert_timestamp,
-                update_user,
-                update_timestamp
-            from ai_stt
-            where voice_file_name = %s
-        """, voice_file_name)
-        result = cursor.fetchone()
+async def get_ai_keyword(voice_file_name: str):
+    # 이미 전달된 결과는 DB 조회 없이 반환
+    cached = completed_results.get(voice_file_name)
+    if cached:
+        return cached
 
+    try:
+        tts_id = None
+        result = result_broker.get(voice_file_name)
+        if result and result.get("result") != "success":
+            # 처리 실패 결과는 캐시하지 않고 그대로 반환
+            return result
         if result:
-            answer_type = result.get("answer_type")
-            client_stt_question = result.get("client_stt_question")
-            ai_chat_answer = result.get("ai_chat_answer")
+            result = dict(result)
+            tts_id = result.pop("tts_id", None)
+        else:
+            result = None
+            row = await repository.find_stt_answer(db, voice_file_name)
 
-            # BTV 검색인 경우 TTS 문구 수정
-            if answer_type == "btv-search":
-                ai_chat_answer = f"'{client_stt_question}'의 검색 결과입니다."
+            if row:
+                answer_type = row.get("answer_type")
+                client_stt_question = row.get("client_stt_question")
+                ai_chat_answer = row.get("ai_chat_answer")
 
-            cursor.execute("""
-                select
-                    id,
-                    client_tts_text,
-                    voice_file_url,
-                    input_type,
-                    response_status,
-                    insert_user,
-                    insert_timestamp,
-                    update_user,
-                    update_timestamp
-                from ai_tts
-                where response_status = 1
-                and input_type = 3
-                and client_tts_text = %s
-                order by input_type, id desc
-                limit 1 
-            """, ai_chat_answer)
-            tts_result = cursor.fetchone()
-
-            if tts_result:
-                id = tts_result.get("id")
-                voice = tts_result.get("voice_file_url")
-
-                set_tts_response_status(int(id))
-
-                return {
-                    "result": "success",
-                    "type": answer_type,
-                    "text": ai_chat_answer,
-                    "voice": voice
-                }
-            else:
-                return {
-                    "result": "fail",
-                    "type": "error",
-                    "text": "아직 답변이 작성되지 않았습니다."
-                }
-        else:
+                # BTV 검색인 경우 TTS 문구 수정
+                if answer_type == "btv-search":
+                    ai_chat_answer = f"'{client_stt_question}'의 검색 결과입니다."
+
+                voice = row.get("voice_file_url")
+                tts_id = row.get("tts_id")
+                if not tts_id:
+                    # tts_id 컬럼 추가 이전 데이터는 문구로 조회
+                    tts_result = await repository.find_ready_tts_by_text(db, ai_chat_answer)
+                    if tts_result:
+                        tts_id = tts_result.get("id")
+                        voice = tts_result.get("voice_file_url")
+
+                if tts_id:
+                    result = {
+                        "result": "success",
+                        "type": answer_type,
+                        "text": ai_chat_answer,
+                        "voice": voice
+                    }
+
+        if result is None:
             return {
                 "result": "fail",
                 "type": "error",
                 "text": "아직 답변이 작성되지 않았습니다."
             }
+
+        if tts_id:
+            await set_tts_response_status(int(tts_id))
+        completed_results.put(voice_file_name, result)
+        return result
     except Exception as e:
         logger.error(f"Error get keyword: {str(e)}")
         return {
@@ -220,6 +457,57 @@ def get_ai_keyword(voice_file_name: str):
         }
 
 
+async def wait_ai_result(voice_file_name: str, timeout: float):
+    result = await result_broker.wait(voice_file_name, timeout)
+    if result is None:
+        return None
+
+    # 푸시로 전달된 TTS 는 수신완료 상태로 변경
+    result = dict(result)
+    tts_id = result.pop("tts_id", None)
+    if tts_id:
+        await set_tts_response_status(tts_id)
+    if result.get("result") == "success":
+        completed_results.put(voice_file_name, result)
+    return result
+
+
+@app.websocket("/ws/ai/result/{voice_file_name}")
+async def push_ai_result(websocket: WebSocket, voice_file_name: str):
+    await websocket.accept()
+    try:
+        result = await wait_ai_result(voice_file_name, result_push_timeout)
+        if result is None:
+            result = {
+                "result": "fail",
+                "type": "error",
+                "text": "아직 답변이 작성되지 않았습니다."
+            }
+        await websocket.send_json(result)
+        await websocket.close()
+    except WebSocketDisconnect:
+        logger.info(f"Result websocket disconnected: {voice_file_name}")
+
+
+@app.get("/api/ai/result/{voice_file_name}/stream")
+async def stream_ai_result(voice_file_name: str):
+    async def event_stream():
+        keepalive_interval = 15
+        waited = 0
+        while waited < result_push_timeout:
+            timeout = min(keepalive_interval, result_push_timeout - waited)
+            result = await wait_ai_result(voice_file_name, timeout)
+            if result is not None:
+                yield f"event: result\ndata: {json.dumps(result, ensure_ascii=False)}\n\n"
+                return
+            waited += timeout
+            yield ": keepalive\n\n"
+        yield "event: timeout\ndata: {}\n\n"
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
 class TTSRequest(BaseModel):
     input_type: str
     text: str
@@ -241,27 +529,10 @@ async def text_to_speech(background_tasks: BackgroundTasks, request: TTSRequest)
 
 
 @app.get("/api/tts/result")
-def get_tts_result():
-    connection = db.get_connection()
-    cursor = connection.cursor()
+async def get_tts_result(input_type: str = None):
     try:
-        cursor.execute("""
-            select
-                id,
-                client_tts_text,
-                voice_file_url,
-                input_type,
-                response_status,
-                insert_user,
-                insert_timestamp,
-                update_user,
-                update_timestamp
-            from ai_tts
-            where response_status = 1
-            order by input_type, id desc
-            limit 1
-        """)
-        result = cursor.fetchone()
+        # 한 항목은 한 소비자에게만 전달되며, 수신완료 처리 전까지 점유 상태로 남는다
+        result = await repository.claim_next_tts(db, input_type, tts_claim_timeout)
 
         if result:
             tts_id = result .get("id")
@@ -290,96 +561,138 @@ def get_tts_result():
         }
 
 
+@app.get("/api/tts/queue")
+async def get_tts_queue():
+    try:
+        depth = await repository.count_ready_tts(db)
+        return {
+            "result": "success",
+            "depth": depth,
+            "total": sum(depth.values())
+        }
+    except Exception as e:
+        logger.error(f"Error get tts queue: {str(e)}")
+        return {
+            "result": "fail",
+            "type": "error",
+            "text": "DB조회 시 에러가 발생했습니다."
+        }
+
+
 @app.get("/api/tts/response/status/{tts_id}")
-def set_tts_response_status(tts_id: int):
-    connection = db.get_connection()
-    cursor = connection.cursor()
+async def set_tts_response_status(tts_id: int):
     try:
-        cursor.execute("""
-            update ai_tts set response_status = 2 
-            where id = %s
-        """, tts_id)
-        connection.commit()
+        await repository.update_tts_response_status(db, tts_id)
 
         return {
             "result": "success",
             "text": "수신완료 상태로 변경되었습니다.",
         }
     except Exception as e:
-        connection.rollback()
         logger.error(f"Error Update DB: {e}")
         return {
             "result": "fail",
             "type": "error",
             "text": "DB저장 시 에러가 발생했습니다."
         }
-    finally:
-        cursor.close()
-        connection.close()
 
 
 @app.get("/api/ai/sports/{file_type}/{channel_id}")
-def get_ai_sports(file_type: str, channel_id: int):
-    text_file_path = os.path.join(voice_folder, f"{channel_id}_{file_type}.json")
-    if not os.path.exists(text_file_path):
-        logger.error(f"File not found: {text_file_path}")
+def get_ai_sports(file_type: str, channel_id: int, request: Request):
+    sports_file = sports_files.get(channel_id, file_type)
+    if sports_file is None:
+        logger.error(f"File not found: {sports_files.path_for(channel_id, file_type)}")
+        return {
+            "result": "fail",
+            "type": "error",
+            "text": "경기 요약 파일 찾기에 실패했습니다."
+        }
+
+    # 미리 압축된 .gz 사본이 있으면 그대로 전송
+    use_gzip = preserialized_responses and sports_file.gzip_body is not None \
+        and "gzip" in request.headers.get("accept-encoding", "")
+
+    # 스크래퍼가 새로 쓰기 전까지는 304
+    headers = {
+        "ETag": sports_file.gzip_etag if use_gzip else sports_file.etag,
+        "Last-Modified": sports_file.last_modified,
+        "Cache-Control": "no-cache",
+        "Vary": "Accept-Encoding"
+    }
+    if sports_file.is_not_modified(request.headers.get("if-none-match"), request.headers.get("if-modified-since")):
+        return Response(status_code=304, headers=headers)
+
+    # 파일 내용이 이미 JSON 이므로 파싱/재직렬화 없이 그대로 반환
+    if use_gzip:
+        return json_bytes_response(sports_file.gzip_body, headers={**headers, "Content-Encoding": "gzip"})
+    if preserialized_responses:
+        return json_bytes_response(sports_file.body, headers=headers)
+    return JSONResponse(content=json.loads(sports_file.body), headers=headers)
+
+
+@app.get("/api/ai/sports/{file_type}/{channel_id}/timeline")
+async def get_ai_sports_timeline(file_type: str, channel_id: int, since: int = 0, wait: float = 0,
+                                 prefix: str = None, version: str = None):
+    # since 이후의 timeline 항목만 반환, wait 초 동안 새 항목을 기다린다(long-poll)
+    # prefix/version 은 직전 응답 값으로, 이미 받은 항목이 바뀌었으면 reset=true 로 전체를 다시 보낸다
+    try:
+        delta = await sports_timeline_watcher.wait(channel_id, file_type, since,
+                                                   min(max(wait, 0), result_push_timeout), prefix, version)
+    except Exception as e:
+        logger.error(f"Error get sports timeline: {str(e)}")
+        delta = None
+
+    if delta is None:
         return {
             "result": "fail",
             "type": "error",
             "text": "경기 요약 파일 찾기에 실패했습니다."
         }
+    return json_bytes_response(dumps_json(delta), headers={"Cache-Control": "no-cache"})
+
+
+@app.get("/api/ai/sports/{file_type}/{channel_id}/timeline/stream")
+async def stream_ai_sports_timeline(file_type: str, channel_id: int, since: int = 0, prefix: str = None,
+                                    version: str = None):
+    async def event_stream():
+        keepalive_interval = 15
+        next_index, next_prefix, next_version = since, prefix, version
+        while True:
+            try:
+                delta = await sports_timeline_watcher.wait(channel_id, file_type, next_index,
+                                                           keepalive_interval, next_prefix, next_version)
+            except Exception as e:
+                logger.error(f"Error stream sports timeline: {str(e)}")
+                delta = None
+
+            if delta is None:
+                yield "event: error\ndata: {}\n\n"
+                return
+            if delta["timeline"] or delta["reset"]:
+                next_index, next_prefix, next_version = delta["next"], delta["prefix"], delta["version"]
+                yield f"id: {next_index}\nevent: timeline\ndata: {dumps_json(delta).decode('utf-8')}\n\n"
+            else:
+                yield ": keepalive\n\n"
 
-    with open(text_file_path, 'r') as f:
-        match_json = json.load(f)
-        return match_json
+    return StreamingResponse(event_stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
 
 
 ################################################
 # VR Golf API Endpoint
 ################################################
 @app.get("/api/vr/golf/{course_id}")
-def get_golf_course_hole(course_id: int):
-    connection = db.get_connection()
-    cursor = connection.cursor()
+async def get_golf_course_hole(course_id: int):
     try:
-        cursor.execute("""
-             select course_id,
-                    course_name,
-                    total_hole_numbers,
-                    total_distance,
-                    course_level,
-                    green_level,
-                    address,
-                    homepage,
-                    tel_no
-             from vr_golf_course
-             where course_id = %s
-        """, course_id)
-        result = cursor.fetchone()
-
-        if result:
-            course_name = result.get("course_name")
-            total_hole_numbers = result.get("total_hole_numbers")
-            total_distance = result.get("total_distance")
-            course_level = result.get("course_level")
-            green_level = result.get("green_level")
-            address = result.get("address")
-            homepage = result.get("homepage")
-            tel_no = result.get("tel_no")
+        await golf_index.ensure_loaded()
+        course = golf_index.get_course(course_id)
 
-            weather_data = get_korea_weather(62, 120)
+        if course:
+            weather_data = await run_in_threadpool(get_course_weather, course.weather_nx, course.weather_ny)
 
             return {
                 "result": "success",
-                "course_id": course_id,
-                "course_name": course_name,
-                "total_hole_numbers": f"{total_hole_numbers}홀",
-                "total_distance": f"{total_distance}m",
-                "course_level": course_level,
-                "green_level": green_level,
-                "address": address,
-                "homepage": homepage,
-                "tel_no": tel_no,
+                **course.payload,
                 "weather": weather_data
             }
         else:
@@ -397,74 +710,68 @@ def get_golf_course_hole(course_id: int):
         }
 
 
-@app.get("/api/vr/golf/{course_id}/{hole_id}")
-def get_golf_course_hole(course_id: int, hole_id: int):
-    connection = db.get_connection()
-    cursor = connection.cursor()
+@app.post("/api/vr/golf/admin/refresh")
+async def refresh_golf_index():
     try:
-        cursor.execute("""
-             select hole_type,
-                    hole_number,
-                    par_score,
-                    hdcp,
-                    back_tee,
-                    champ_tee,
-                    front_tee,
-                    senior_tee,
-                    lady_tee,
-                    map_image_link,
-                    map_video_link,
-                    voice_file_name,
-                    voice_text,
-                    tee_box_lat,
-                    tee_box_long,
-                    hole_cup_lat,
-                    hole_cup_long
-             from vr_golf_course_hole
-             where course_id = %s
-             and hole_id = %s
-        """, (course_id, hole_id))
-        result = cursor.fetchone()
+        await golf_index.refresh()
+        return {
+            "result": "success",
+            **golf_index.stats()
+        }
+    except Exception as e:
+        logger.error(f"Error refresh golf index: {str(e)}")
+        return {
+            "result": "fail",
+            "type": "error",
+            "text": "DB조회 시 에러가 발생했습니다."
+        }
 
-        if result:
-            hole_type = result.get("hole_type")
-            hole_number = result.get("hole_number")
-            par_score = result.get("par_score")
-            hdcp = result.get("hdcp")
-            back_tee = result.get("back_tee")
-            champ_tee = result.get("champ_tee")
-            front_tee = result.get("front_tee")
-            senior_tee = result.get("senior_tee")
-            lady_tee = result.get("lady_tee")
-            map_image_link = result.get("map_image_link")
-            map_video_link = result.get("map_video_link")
-            voice_file_name = result.get("voice_file_name")
-            voice_text = result.get("voice_text")
-            tee_box_lat = result.get("tee_box_lat")
-            tee_box_long = result.get("tee_box_long")
-            hole_cup_lat = result.get("hole_cup_lat")
-            hole_cup_long = result.get("hole_cup_long")
 
+@app.get("/api/vr/golf/{course_id}/snapshot")
+async def get_golf_course_snapshot(course_id: int, request: Request):
+    try:
+        await golf_index.ensure_loaded()
+        course = golf_index.get_course(course_id)
+        if course is None:
             return {
-                "result": "success",
-                "hole_type": hole_type,
-                "hole_number": hole_number,
-                "par_score": par_score,
-                "hdcp": hdcp,
-                "back_tee": f"{back_tee}m",
-                "champ_tee": f"{champ_tee}m",
-                "front_tee": f"{front_tee}m",
-                "senior_tee": f"{senior_tee}m",
-                "lady_tee": f"{lady_tee}m",
-                "map_image_link": map_image_link,
-                "map_video_link": map_video_link,
-                "voice_text": voice_text,
-                "voice_link": f"{os.getenv('APP_URL')}/static/{voice_file_name}",
-                "tee_box_lat": tee_box_lat,
-                "tee_box_long": tee_box_long,
-                "hole_cup_lat": hole_cup_lat,
-                "hole_cup_long": hole_cup_long,
+                "result": "fail",
+                "type": "error",
+                "text": "골프장 정보가 없습니다."
             }
+
+        weather_data = await run_in_threadpool(get_course_weather, course.weather_nx, course.weather_ny)
+
+        # 골프장/홀 정보 버전과 날씨가 같으면 304
+        etag_source = f"{course.version}|{json.dumps(weather_data, sort_keys=True, ensure_ascii=False)}"
+        etag = f'"{hashlib.sha1(etag_source.encode("utf-8")).hexdigest()}"'
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers={"ETag": etag})
+
+        return JSONResponse(content={
+            "result": "success",
+            **course.payload,
+            "weather": weather_data,
+            "holes": [dict(hole) for hole in course.holes]
+        }, headers={"ETag": etag, "Cache-Control": "no-cache"})
+    except Exception as e:
+        logger.error(f"Error get golf snapshot: {str(e)}")
+        return {
+            "result": "fail",
+            "type": "error",
+            "text": "DB조회 시 에러가 발생했습니다."
+        }
+
+
+@app.get("/api/vr/golf/{course_id}/{hole_id}")
+async def get_golf_course_hole(course_id: int, hole_id: int):
+    try:
+        await golf_index.ensure_loaded()
+        result = golf_index.get_hole(course_id, hole_id)
+
+        if result:
+            if preserialized_responses:
+                return json_bytes_response(golf_index.get_hole_body(course_id, hole_id))
+            return dict(result)
         else:
             return {
                 "result": "fail",
@@ -498,22 +805,27 @@ def deg_to_dir(deg):
     return close_dir
 
 
-def get_korea_weather(nx: int, ny: int):
-    serviceKey = os.getenv("WEATHER_SERVICE_API_KEY")
+def get_course_weather(nx: int, ny: int):
+    # 미리 받아둔 예보가 있으면 외부 호출 없이 사용 (새 발표 직후에는 직전 발표분까지 허용)
+    # 골프장 지점은 일괄 수집(weather_prefetcher)이 켜져 있으면 그쪽에서만 갱신하므로 refresh_loop 대상으로 기록하지 않음
+    track = not weather_prefetch
+    weather_data = forecast_cache.get_latest(nx, ny, track)
+    previous_base = (get_ultra_short_base_datetime() - timedelta(hours=1)).strftime("%Y%m%d%H%M")
+    if weather_data and weather_data.get("base_date") + weather_data.get("base_time") >= previous_base:
+        return dict(weather_data)
+    return get_korea_weather(nx, ny, track)
 
-    result = {}
 
-    now = datetime.now()
-    if now.minute < 30:
-        last_half_hour = (now.replace(minute=30, second=0, microsecond=0) - timedelta(hours=1))
-    else:
-        last_half_hour = now.replace(minute=30, second=0, microsecond=0)
+def get_korea_weather(nx: int, ny: int, track: bool = True):
+    # 발표 시각 단위로 캐시된 예보 사용
+    base_date, base_time = get_ultra_short_base_time()
+    return dict(forecast_cache.get(nx, ny, base_date, base_time, track))
 
-    yyyymmdd = last_half_hour.strftime("%Y%m%d")
-    hh24mi = last_half_hour.strftime("%H%M")
 
-    base_date = yyyymmdd
-    base_time = hh24mi
+def fetch_korea_weather(nx: int, ny: int, base_date: str, base_time: str):
+    serviceKey = os.getenv("WEATHER_SERVICE_API_KEY")
+
+    result = {}
 
     result["base_date"] = base_date
     result["base_time"] = base_time
@@ -525,9 +837,14 @@ def get_korea_weather(nx: int, ny: int):
 
     url = f"http://apis.data.go.kr/1360000/VilageFcstInfoService_2.0/getUltraSrtFcst?serviceKey={serviceKey}" \
           f"&numOfRows=60&pageNo=1&dataType=json&base_date={base_date}&base_time={base_time}&nx={nx}&ny={ny}"
-    response = requests.get(url, verify=False)
+    response = weather_session.get(url, verify=False)
     res = json.loads(response.text)
 
+    # 아직 제공되지 않은 발표분(NO_DATA 등)은 캐시하지 않도록 예외 처리
+    header = res.get('response', {}).get('header', {})
+    if header.get('resultCode') != '00':
+        raise ValueError(f"weather forecast not available: {base_date}{base_time} ({header.get('resultMsg')})")
+
     informations = dict()
     for items in res['response']['body']['items']['item']:
         cate = items['category']
@@ -581,77 +898,17 @@ def get_korea_weather(nx: int, ny: int):
 
 
 @app.get("/api/vr/golf/{course_id}/allholecup/")
-def get_golf_course_all_holecup(course_id: int):
-    connection = db.get_connection()
-    cursor = connection.cursor()
+async def get_golf_course_all_holecup(course_id: int):
     try:
-        cursor.execute("""
-             select hole_type,
-                    hole_number,
-                    par_score,
-                    hdcp,
-                    back_tee,
-                    champ_tee,
-                    front_tee,
-                    senior_tee,
-                    lady_tee,
-                    map_image_link,
-                    map_video_link,
-                    voice_file_name,
-                    voice_text,
-                    tee_box_lat,
-                    tee_box_long,
-                    hole_cup_lat,
-                    hole_cup_long
-             from vr_golf_course_hole
-             where course_id = %s
-        """, course_id)
-        rows = cursor.fetchall()
-
-        result = []
-        if rows:
-            for row in rows:
-                hole_type = row.get("hole_type")
-                hole_number = row.get("hole_number")
-                par_score = row.get("par_score")
-                hdcp = row.get("hdcp")
-                back_tee = row.get("back_tee")
-                champ_tee = row.get("champ_tee")
-                front_tee = row.get("front_tee")
-                senior_tee = row.get("senior_tee")
-                lady_tee = row.get("lady_tee")
-                map_image_link = row.get("map_image_link")
-                map_video_link = row.get("map_video_link")
-                voice_file_name = row.get("voice_file_name")
-                voice_text = row.get("voice_text")
-                tee_box_lat = row.get("tee_box_lat")
-                tee_box_long = row.get("tee_box_long")
-                hole_cup_lat = row.get("hole_cup_lat")
-                hole_cup_long = row.get("hole_cup_long")
-
-                result.append({
-                    "result": "success",
-                    "hole_type": hole_type,
-                    "hole_number": hole_number,
-                    "par_score": par_score,
-                    "hdcp": hdcp,
-                    "back_tee": f"{back_tee}m",
-                    "champ_tee": f"{champ_tee}m",
-                    "front_tee": f"{front_tee}m",
-                    "senior_tee": f"{senior_tee}m",
-                    "lady_tee": f"{lady_tee}m",
-                    "map_image_link": map_image_link,
-                    "map_video_link": map_video_link,
-                    "voice_text": voice_text,
-                    "voice_link": f"{os.getenv('APP_URL')}/static/{voice_file_name}",
-                    "tee_box_lat": tee_box_lat,
-                    "tee_box_long": tee_box_long,
-                    "hole_cup_lat": hole_cup_lat,
-                    "hole_cup_long": hole_cup_long,
-                })
+        await golf_index.ensure_loaded()
+        course = golf_index.get_course(course_id)
+
+        if course and course.holes:
+            if preserialized_responses:
+                return json_bytes_response(course.holes_body)
             return {
                 "result": "success",
-                "list": result
+                "list": [dict(hole) for hole in course.holes]
             }
         else:
             return {
@@ -671,147 +928,226 @@ def get_golf_course_all_holecup(course_id: int):
 # 내부 처리 함수
 ################################################
 
-def get_ai_tts(input_type: str, text: str):
-    connection = db.get_connection()
-    cursor = connection.cursor()
-    try:
-        url = "https://api.edenai.run/v2/audio/text_to_speech"
-
-        payload = {
-            "response_as_dict": True,
-            "attributes_as_list": False,
-            "show_original_response": False,
-            "rate": 0,
-            "pitch": 0,
-            "volume": 100,
-            "sampling_rate": 0,
-            "providers": "google",
-            "text": text,
-            "language": "ko",
-            "option": "FEMALE"
-        }
-        headers = {
-            "accept": "application/json",
-            "content-type": "application/json",
-            "authorization": f"Bearer {edenai_api_key}"
-        }
+def create_tts_voice(text: str):
+    tts_options = {
+        "rate": 0,
+        "pitch": 0,
+        "providers": "google",
+        "language": "ko",
+        "option": "FEMALE"
+    }
 
-        response = requests.post(url, json=payload, headers=headers)
+    # 동일 문장/옵션으로 생성된 음성이 있으면 Eden AI 호출 생략
+    cache_key = TtsCache.make_key(text, tts_options["language"], tts_options["providers"],
+                                  tts_options["option"], tts_options["rate"], tts_options["pitch"])
+    cached_url = tts_cache.get(cache_key)
+    if cached_url:
+        logger.info(f"TTS cache hit: {cache_key}")
+        return cached_url
+
+    url = "https://api.edenai.run/v2/audio/text_to_speech"
+
+    payload = {
+        "response_as_dict": True,
+        "attributes_as_list": False,
+        "show_original_response": False,
+        "volume": 100,
+        "sampling_rate": 0,
+        "text": text,
+        **tts_options
+    }
+    headers = {
+        "accept": "application/json",
+        "content-type": "application/json",
+        "authorization": f"Bearer {edenai_api_key}"
+    }
 
-        data = json.loads(response.text)
+    response = requests.post(url, json=payload, headers=headers)
 
-        if data and data.get("google") and data.get("google").get("audio_resource_url"):
-            voice_file_link = data.get("google").get("audio_resource_url")
+    data = json.loads(response.text)
 
-            cursor.execute("""
-                insert into ai_tts(
-                    client_tts_text,
-                    voice_file_url,
-                    input_type,
-                    response_status,
-                    insert_user,
-                    update_user 
-                ) values (
-                    %s, %s, %s, %s, %s, %s
-                )
-            """, (
-                text,
-                voice_file_link,
-                input_type,
-                1,
-                "client",
-                "client",
-            ))
-            connection.commit()
-            logger.info("tts complete!")
-        else:
-            logger.error("Error text to speech: tts api error")
-    except Exception as e:
-        connection.rollback()
-        logger.error(f"Error text to speech: {e}")
-    finally:
-        cursor.close()
-        connection.close()
+    if not (data and data.get("google") and data.get("google").get("audio_resource_url")):
+        return None
 
+    audio_resource_url = data.get("google").get("audio_resource_url")
+    try:
+        audio_response = requests.get(audio_resource_url)
+        audio_response.raise_for_status()
+        extension = os.path.splitext(audio_resource_url.split("?")[0])[1].lstrip(".") or "mp3"
+        return tts_cache.put(cache_key, audio_response.content, extension)
+    except Exception as e:
+        # 캐시 저장 실패 시 Eden AI 음성 주소를 그대로 사용
+        logger.error(f"Error save tts cache: {e}")
+        return audio_resource_url
 
-def get_ai_stt(audio_file_path: str, voice_file_name: str):
-    retry_count = 0
-    max_retries = 5
 
-    while retry_count <= max_retries:
-        connection = db.get_connection()
-        cursor = connection.cursor()
-        try:
-            with open(audio_file_path, "rb") as audio_file:
-                transcript = client.audio.transcriptions.create(
-                    model=stt_model,
-                    file=audio_file,
-                    response_format="text"
-                )
-            logger.info(f"Transcription successful for file: {voice_file_name}")
-
-            message, answer_type = send_query(transcript)
+def get_ai_tts(input_type: str, text: str):
+    try:
+        voice_file_link = create_tts_voice(text)
 
-            if answer_type > 0:
+        if voice_file_link:
+            with db.sync_cursor() as cursor:
                 cursor.execute("""
-                    insert into ai_stt(
-                        voice_file_name, 
-                        client_stt_question,
-                        answer_type,
-                        ai_chat_answer,
+                    insert into ai_tts(
+                        client_tts_text,
+                        voice_file_url,
+                        input_type,
+                        response_status,
                         insert_user,
                         update_user 
                     ) values (
                         %s, %s, %s, %s, %s, %s
                     )
                 """, (
-                    voice_file_name,
-                    transcript,
-                    answer_type,
-                    message,
+                    text,
+                    voice_file_link,
+                    input_type,
+                    1,
                     "client",
                     "client",
                 ))
+                tts_id = cursor.lastrowid
+            logger.info("tts complete!")
+            return {
+                "tts_id": tts_id,
+                "voice": voice_file_link
+            }
+        else:
+            logger.error("Error text to speech: tts api error")
+            return None
+    except Exception as e:
+        logger.error(f"Error text to speech: {e}")
+        return None
 
-                # BTV 검색인 경우 TTS 문구 수정
-                if answer_type == 1:
-                    message = f"'{transcript}'의 검색 결과입니다."
-
-                # TTS 생성 API 호출
-                tts_url = f"{app_url}/api/tts"
-                payload = {
-                    "input_type": "3",
-                    "text": message
-                }
-                headers = {
-                    "accept": "application/json",
-                    "content-type": "application/json",
-                }
-                response = requests.post(tts_url, json=payload, headers=headers)
-                tts_result = json.loads(response.text)
-                if tts_result.get("result") == "success":
-                    logger.info("text to speech API Call Complete.")
-                    connection.commit()
-                    retry_count += 10
-                else:
-                    logger.error(f"Error text to speech, trying count: {retry_count}")
-                    retry_count += 1
-            else:
-                logger.error(f"Error speech to text, trying count: {retry_count}")
-                retry_count += 1
+
+def run_stt_stage(audio_source):
+    with open(audio_source, "rb") as audio_file:
+        return client.audio.transcriptions.create(
+            model=stt_model,
+            file=audio_file,
+            response_format="text"
+        )
+
+
+def run_intent_stage(transcript: str):
+    # 같거나 유사한 질문의 이전 답변이 있으면 재사용
+    cached = answer_cache.get(transcript)
+    if cached:
+        logger.info(f"Answer cache hit: {transcript}")
+        return cached
+
+    message, answer_type = send_query(transcript)
+    if answer_type > 0:
+        answer_cache.put(transcript, message, answer_type)
+    return message, answer_type
+
+
+def run_tts_stage(tts_text: str):
+    return get_ai_tts("3", tts_text)
+
+
+def get_answer_type_name(answer_type: int):
+    if answer_type == 1:
+        return "btv-search"
+    elif answer_type == 2:
+        return "weather"
+    return "ai-answer"
+
+
+def run_with_retry(stage: str, func, *args, accept=bool):
+    # 실패한 단계만 지수 백오프로 재시도하고, 끝내 실패하면 None 반환
+    for attempt in range(stt_stage_retries + 1):
+        try:
+            result = func(*args)
+            if accept(result):
+                return result
+            logger.error(f"Error {stage}: empty result, trying count: {attempt}")
         except Exception as e:
-            connection.rollback()
-            logger.error(f"Error speech to text: {e}, trying count: {retry_count}")
-            retry_count += 1
-            if retry_count > max_retries:
-                logger.error("Maximum retry attempts reached. Giving up.")
-                break
-        finally:
-            cursor.close()
-            connection.close()
+            logger.error(f"Error {stage}: {e}, trying count: {attempt}")
+
+        if attempt < stt_stage_retries:
+            time.sleep(stt_retry_backoff * 2 ** attempt * (1 + random.random() * 0.1))
+    return None
+
+
+def get_ai_stt(audio_source, voice_file_name: str):
+    timings = {}
+
+    # 1단계: 음성 인식
+    started = time.perf_counter()
+    transcript = run_with_retry("speech to text", run_stt_stage, audio_source, accept=lambda result: result is not None)
+    timings["stt"] = time.perf_counter() - started
 
-        if retry_count <= max_retries:
-            break
+    answer = None
+    if transcript is not None:
+        logger.info(f"Transcription successful for file: {voice_file_name}")
+
+        # 2단계: 질의 의도 분석 및 답변 생성
+        started = time.perf_counter()
+        answer = run_with_retry("intent", run_intent_stage, transcript, accept=lambda result: result[1] > 0)
+        timings["intent"] = time.perf_counter() - started
+
+    tts_result = None
+    if answer is not None:
+        message, answer_type = answer
+
+        # BTV 검색인 경우 TTS 문구 수정
+        tts_text = message
+        if answer_type == 1:
+            tts_text = f"'{transcript}'의 검색 결과입니다."
+
+        # 3단계: 답변 음성 생성 (같은 프로세스에서 직접 호출)
+        started = time.perf_counter()
+        tts_result = run_with_retry("text to speech", run_tts_stage, tts_text)
+        timings["tts"] = time.perf_counter() - started
+
+    if tts_result is None:
+        logger.error(f"Maximum retry attempts reached. Giving up: {voice_file_name}")
+        result_broker.publish(voice_file_name, {
+            "result": "fail",
+            "type": "error",
+            "text": "답변 생성에 실패했습니다."
+        })
+        return
+
+    # 음성까지 생성된 경우에만 STT 결과 저장
+    # 저장에 실패해도 이미 만든 답변은 전달 (유료 단계를 다시 실행하지 않음)
+    try:
+        with db.sync_cursor() as cursor:
+            cursor.execute("""
+                insert into ai_stt(
+                    voice_file_name, 
+                    client_stt_question,
+                    answer_type,
+                    ai_chat_answer,
+                    tts_id,
+                    insert_user,
+                    update_user 
+                ) values (
+                    %s, %s, %s, %s, %s, %s, %s
+                )
+            """, (
+                voice_file_name,
+                transcript,
+                answer_type,
+                message,
+                tts_result.get("tts_id"),
+                "client",
+                "client",
+            ))
+    except Exception as e:
+        logger.error(f"Error insert ai_stt: {e}")
+    logger.info(f"STT pipeline complete for file: {voice_file_name}, " +
+                ", ".join(f"{stage}={elapsed * 1000:.0f}ms" for stage, elapsed in timings.items()))
+
+    # 결과 대기 중인 클라이언트에게 전달
+    result_broker.publish(voice_file_name, {
+        "result": "success",
+        "type": get_answer_type_name(answer_type),
+        "text": tts_text,
+        "voice": tts_result.get("voice"),
+        "tts_id": tts_result.get("tts_id")
+    })
 
 
 def current_weather_info(city: str):
@@ -881,8 +1217,32 @@ def search_media_keywords(sentence: str):
     return keyword
 
 
+def call_query_function(function_name: str, args: dict):
+    available_functions = {
+        "search_media_keywords": search_media_keywords,
+        "current_weather_info": current_weather_info
+    }
+    func = available_functions[function_name]
+    func_response = func(**args)
+
+    answer_type = 4  # 4(default) type: 기타
+    if function_name == "search_media_keywords":  # 1 type: BTV 검색
+        answer_type = 1
+    elif function_name == "current_weather_info":  # 2 type: 날씨
+        answer_type = 2
+
+    return func_response, answer_type
+
+
 def send_query(prompt):
     try:
+        # Step 0: 명확한 질의는 로컬 규칙으로 바로 함수 호출
+        route = intent_router.route(f"{prompt}")
+        if route:
+            function_name, args = route
+            logger.info(f"Intent routed locally: {function_name}")
+            return call_query_function(function_name, args)
+
         # Step 1: finstate_summary 함수 준비
         messages = [{"role": "user", "content": f"{prompt}"}]
 
@@ -916,22 +1276,10 @@ def send_query(prompt):
             return response_message.content, answer_type
 
         # Step 3: GPT가 어떤 함수를 호출을 원하는지 알아내어 지정한 함수를 호출
-        available_functions = {
-            "search_media_keywords": search_media_keywords,
-            "current_weather_info": current_weather_info
-        }
         function_name = response_message.function_call.name
         arguments = response_message.function_call.arguments
-        func = available_functions[function_name]
         args = json.loads(arguments)
-        func_response = func(**args)
-
-        if function_name == "search_media_keywords":  # 1 type: BTV 검색
-            answer_type = 1
-        elif function_name == "current_weather_info":  # 2 type: 날씨
-            answer_type = 2
-
-        return func_response, answer_type
+        return call_query_function(function_name, args)
     except Exception as e:
         return e, -1
 
@@ -0,0 +1,470 @@
+import hashlib
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass
+
+import requests
+from lxml import html as lxml_html
+
+from json_file import write_json_file
+
+logger = logging.getLogger(__name__)
+
+lineup_url = "https://m.sports.naver.com/game/{game_number}/lineup"
+relay_url = "https://m.sports.naver.com/game/{game_number}/relay"
+
+# 중계 페이지가 화면을 그릴 때 받아오는 JSON API
+game_api_url = "https://api-gw.sports.naver.com/schedule/games/{game_number}"
+lineup_api_url = "https://api-gw.sports.naver.com/schedule/games/{game_number}/lineup"
+relay_api_url = "https://api-gw.sports.naver.com/schedule/games/{game_number}/relay"
+
+# 출력 JSON 들여쓰기 여부 / .gz 사본 생성 여부
+pretty_output = os.getenv("SPORTS_JSON_PRETTY", "false").lower() == "true"
+compress_output = os.getenv("SPORTS_JSON_GZIP", "true").lower() == "true"
+
+# 하이라이트 파일에 포함되는 상태
+highlight_states = ["goal", "owngoal", "change", "card1", "card2", "quarter_finish1"]
+
+# 중계 아이콘(blind) 텍스트 -> 상태
+state_names = {
+    "골": "goal",
+    "자책골": "owngoal",
+    "도움": "assistance",
+    "교체": "change",
+    "경고": "card1",
+}
+
+# 중계 JSON 의 eventType(소문자, '_' 제거) -> 중계 아이콘 텍스트
+event_labels = {
+    "goal": "골",
+    "owngoal": "자책골",
+    "assist": "도움",
+    "substitution": "교체",
+    "yellowcard": "경고",
+    "redcard": "퇴장",
+    "secondyellowcard": "경고 퇴장",
+}
+
+
+def event_fingerprint(time_text: str, desc_text: str):
+    return hashlib.sha1(f"{time_text}|{desc_text}".encode("utf-8")).hexdigest()
+
+
+def parse_state(state: str, time_text: str):
+    if state in state_names:
+        return state_names[state]
+    if "퇴장" in state:
+        return "card2"
+    if time_text == "HT":
+        return "quarter_finish1"
+    if not time_text:
+        return "quarter_finish2"
+    return "none"
+
+
+def make_time_line(time_text: str, desc_text: str, state: str = None, name: str = None):
+    # state 는 아이콘이 없는 항목이면 None
+    time_line = {
+        "time": time_text,
+        "desc": desc_text,
+        "type": "none" if time_text == "HT" or time_text else ""
+    }
+
+    if state is not None:
+        time_line["state"] = parse_state(state, time_text)
+
+    if time_line.get("state") in ["goal", "owngoal", "change"]:
+        time_line["name"] = name or ""
+        if time_line.get("state") == "change":
+            time_line["in"] = ""
+            time_line["out"] = ""
+    return time_line
+
+
+def build_match_data(home_info, away_info, timeline):
+    # timeline 은 시간순(오래된 항목 먼저)
+    match_realtime_data = {
+        "home_team": home_info,
+        "away_team": away_info,
+        "timeline": timeline,
+    }
+    match_highlight_data = {
+        "home_team": home_info,
+        "away_team": away_info,
+        "timeline": [time_line for time_line in timeline if time_line.get("state") in highlight_states],
+    }
+    return match_realtime_data, match_highlight_data
+
+
+def match_file_path(output_dir: str, channel_number: str, file_type: str):
+    return os.path.join(output_dir, f"{channel_number}_{file_type}.json")
+
+
+def save_match_file(output_dir: str, channel_number: str, file_type: str, data):
+    file_path = match_file_path(output_dir, channel_number, file_type)
+    body = write_json_file(file_path, data, pretty_output, compress_output)
+    logger.info(f"Match file saved: {file_path} ({len(body)} bytes)")
+    return file_path
+
+
+def save_match_files(output_dir: str, channel_number: str, players, match_realtime_data, match_highlight_data):
+    # {channel}_player.json / {channel}_realtime.json / {channel}_highlight.json 저장
+    save_match_file(output_dir, channel_number, "player", players)
+    save_match_file(output_dir, channel_number, "realtime", match_realtime_data)
+    save_match_file(output_dir, channel_number, "highlight", match_highlight_data)
+
+
+class MatchState:
+    """
+    경기별 수집 상태. 마지막으로 처리한 중계 항목(time+desc 지문) 이후의 새 항목만 timeline 에 이어 붙이고,
+    내용이 바뀐 파일만 다시 쓴다. 시작 시 기존 {channel}_player/realtime.json 을 읽어 이어서 수집한다
+    """
+
+    def __init__(self, output_dir: str, channel_number: str):
+        self.output_dir = output_dir
+        self.channel_number = channel_number
+        self.players = self.load("player")
+        realtime = self.load("realtime") or {}
+        self.home_info = realtime.get("home_team")
+        self.away_info = realtime.get("away_team")
+        self.timeline = list(realtime.get("timeline") or [])
+
+    def load(self, file_type: str):
+        try:
+            with open(match_file_path(self.output_dir, self.channel_number, file_type), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+
+    @property
+    def last_fingerprint(self):
+        if not self.timeline:
+            return None
+        return event_fingerprint(self.timeline[-1].get("time"), self.timeline[-1].get("desc"))
+
+    def apply(self, result):
+        # 바뀐 파일 종류 목록 반환
+        changed = []
+        if result.players is not None and result.players != self.players:
+            self.players = result.players
+            changed.append("player")
+
+        if result.complete:
+            timeline_changed = result.timeline != self.timeline
+            self.timeline = list(result.timeline)
+        else:
+            timeline_changed = bool(result.timeline)
+            self.timeline.extend(result.timeline)
+
+        if timeline_changed or result.home_info != self.home_info or result.away_info != self.away_info:
+            self.home_info = result.home_info
+            self.away_info = result.away_info
+            changed += ["realtime", "highlight"]
+        return changed
+
+    def save(self, changed):
+        match_realtime_data, match_highlight_data = build_match_data(self.home_info, self.away_info, self.timeline)
+        data = {"player": self.players, "realtime": match_realtime_data, "highlight": match_highlight_data}
+        for file_type in changed:
+            save_match_file(self.output_dir, self.channel_number, file_type, data[file_type])
+
+
+################################################
+# HTML 파싱 (lxml)
+################################################
+
+def _text(element):
+    return " ".join(element.text_content().split()) if element is not None else ""
+
+
+def _class_contains(name: str):
+    return f'contains(@class, "{name}")'
+
+
+def _class_token(name: str):
+    return f'contains(concat(" ", normalize-space(@class), " "), " {name} ")'
+
+
+def _first(elements):
+    return elements[0] if elements else None
+
+
+def parse_lineup_html(page: str):
+    document = lxml_html.fromstring(page)
+    game_section = _first(document.xpath(f'//*[@id="content"]//section[{_class_contains("Home_game_panel")}][last()]'))
+    if game_section is None:
+        return {}
+
+    players = {}
+    for team_type, class_name in (("home", "LineUp_home_team"), ("away", "LineUp_away_team")):
+        lineup = _first(game_section.xpath(f'.//div[{_class_contains(class_name)}][last()]'))
+        if lineup is None:
+            continue
+        for span in lineup.xpath(f'.//span[{_class_contains("LineUp_name")}]'):
+            players[_text(span)] = team_type
+
+    # 후보 선수
+    for tr in game_section.xpath('(.//table)[1]//tr[td]'):
+        tds = tr.xpath('./td')
+        if len(tds) < 2:
+            continue
+        home_candidate = _first(tds[0].xpath('.//span'))
+        away_candidate = _first(tds[1].xpath('.//span'))
+        if home_candidate is not None:
+            players[_text(home_candidate)] = "home"
+        if away_candidate is not None:
+            players[_text(away_candidate)] = "away"
+    return players
+
+
+def parse_team_info(match_head, team_type: int):
+    ems = match_head.xpath('.//em')
+    imgs = match_head.xpath('.//img')
+    name = _text(ems[team_type]) if len(ems) > team_type else ""
+    return {
+        # 홈팀 이름 앞의 구분 문자 제거
+        "name": name[1:] if team_type == 0 else name,
+        "logo": imgs[team_type].get("src") if len(imgs) > team_type else None,
+    }
+
+
+def parse_relay_items(document, stop_fingerprint: str = None):
+    # 중계 목록을 화면 순서(최신 항목 먼저)대로 반환
+    # stop_fingerprint 항목을 만나면 거기서 멈추고 (이후 항목, True) 를 반환
+    items = []
+    for relay_list_area in document.xpath(f'//*[@id="content"]//*[{_class_token("relay_list_area")}]'):
+        for li in relay_list_area.xpath('.//li'):
+            divs = li.xpath('.//div')
+            if len(divs) < 2:
+                continue
+            info_area, relay_text_area = divs[0], divs[1]
+
+            time_text = _text(_first(info_area.xpath('.//span')))
+            desc_text = _text(_first(relay_text_area.xpath('.//p')))
+            if stop_fingerprint and event_fingerprint(time_text, desc_text) == stop_fingerprint:
+                return items, True
+
+            state = None
+            if len(info_area.xpath('.//span')) > 1:
+                state = _text(_first(info_area.xpath(f'.//*[{_class_token("blind")}]')))
+
+            items.append({
+                "time": time_text,
+                "desc": desc_text,
+                "state": state,
+                "name": _text(_first(relay_text_area.xpath('.//strong'))),
+            })
+    return items, False
+
+
+def parse_relay_html(page: str, stop_fingerprint: str = None):
+    document = lxml_html.fromstring(page)
+    match_head = _first(document.xpath(f'//*[@id="content"]//section[{_class_contains("Home_game_head")}][last()]'))
+    if match_head is None:
+        raise ValueError("relay page has no Home_game_head section (not rendered)")
+
+    home_info = parse_team_info(match_head, 0)
+    away_info = parse_team_info(match_head, 1)
+
+    items, found = parse_relay_items(document, stop_fingerprint)
+    return home_info, away_info, build_timeline(items), not found
+
+
+def build_timeline(items):
+    # 화면 순서(최신 항목 먼저)의 중계 항목 -> 시간순 timeline
+    return [
+        make_time_line(item.get("time"), item.get("desc"), item.get("state"), item.get("name"))
+        for item in reversed(items)
+    ]
+
+
+################################################
+# JSON 파싱 (중계 API)
+################################################
+
+def _api_result(data, name: str):
+    result = data.get("result") if isinstance(data, dict) else None
+    if not isinstance(result, dict) or data.get("success") is False:
+        raise ValueError(f"{name} api returned no result: {str(data)[:200]}")
+    return result
+
+
+def parse_game_json(data):
+    game = _api_result(data, "game").get("game") or {}
+    home_info = {"name": game.get("homeTeamName") or "", "logo": game.get("homeTeamEmblemUrl")}
+    away_info = {"name": game.get("awayTeamName") or "", "logo": game.get("awayTeamEmblemUrl")}
+    return home_info, away_info
+
+
+def parse_lineup_json(data):
+    # 선발/후보를 합친 fullLineUp 의 선수 이름 -> home/away
+    result = _api_result(data, "lineup")
+    players = {}
+    for team_type, key in (("home", "homeTeamLineUp"), ("away", "awayTeamLineUp")):
+        for player in (result.get(key) or {}).get("fullLineUp") or []:
+            if player.get("playerName"):
+                players[player.get("playerName")] = team_type
+    return players
+
+
+def parse_relay_state(event_type: str, time_text: str):
+    # 아이콘이 없는 항목은 None, 하프타임/경기 종료 항목은 시간으로 상태를 정한다
+    event_type = (event_type or "").lower().replace("_", "")
+    if event_type:
+        return event_labels.get(event_type, event_type)
+    if time_text in ["HT", ""]:
+        return ""
+    return None
+
+
+def parse_relay_json(data, stop_fingerprint: str = None):
+    # textRelays 는 화면과 같은 순서(최신 항목 먼저), stop_fingerprint 항목을 만나면 거기서 멈춘다
+    text_relays = (_api_result(data, "relay").get("textRelayData") or {}).get("textRelays")
+    if not isinstance(text_relays, list):
+        raise ValueError("relay api returned no textRelays")
+
+    items = []
+    found = False
+    for relay in text_relays:
+        time_text = " ".join(f"{relay.get('time') or ''}".split())
+        desc_text = " ".join(f"{relay.get('text') or ''}".split())
+        if stop_fingerprint and event_fingerprint(time_text, desc_text) == stop_fingerprint:
+            found = True
+            break
+        items.append({
+            "time": time_text,
+            "desc": desc_text,
+            "state": parse_relay_state(relay.get("eventType"), time_text),
+            "name": relay.get("playerName") or "",
+        })
+    return build_timeline(items), not found
+
+
+@dataclass(frozen=True, slots=True)
+class RelayResult:
+    players: dict  # 라인업을 받지 않은 경우 None
+    home_info: dict
+    away_info: dict
+    timeline: list  # 시간순
+    complete: bool  # False 면 stop_fingerprint 이후의 새 항목만 포함
+
+
+################################################
+# 경기 정보 수집
+################################################
+
+class HttpRelayFetcher:
+    """
+    Chrome 없이 중계 페이지가 쓰는 JSON API(경기/라인업/중계)를 HTTP 로 받아 파싱
+    fixture_dir 를 지정하면 {game_number}_game.json / _lineup.json / _relay.json 저장 파일을 대신 읽고,
+    save_dir 를 지정하면 받은 응답을 같은 이름으로 저장한다
+    팀 정보는 라인업과 함께 받아 경기별로 재사용한다
+    """
+
+    def __init__(self, session: requests.Session = None, timeout: float = 5, fixture_dir: str = None,
+                 save_dir: str = None):
+        self.session = session or requests.Session()
+        self.session.headers.setdefault("User-Agent", "Mozilla/5.0 (iPhone; CPU iPhone OS 17_0 like Mac OS X)")
+        self.session.headers.setdefault("Referer", "https://m.sports.naver.com/")
+        self.timeout = timeout
+        self.fixture_dir = fixture_dir
+        self.save_dir = save_dir
+        self.teams = {}  # game_number -> (home_info, away_info)
+
+    def fetch_json(self, url_template: str, game_number: str, name: str):
+        file_name = f"{game_number}_{name}.json"
+        if self.fixture_dir:
+            with open(os.path.join(self.fixture_dir, file_name), "r", encoding="utf-8") as f:
+                return json.load(f)
+
+        response = self.session.get(url_template.format(game_number=game_number), timeout=self.timeout)
+        response.raise_for_status()
+        if self.save_dir:
+            with open(os.path.join(self.save_dir, file_name), "wb") as f:
+                f.write(response.content)
+        return response.json()
+
+    def fetch(self, game_number: str, stop_fingerprint: str = None, with_lineup: bool = True):
+        started = time.perf_counter()
+        players = None
+        if with_lineup or game_number not in self.teams:
+            self.teams[game_number] = parse_game_json(self.fetch_json(game_api_url, game_number, "game"))
+        if with_lineup:
+            players = parse_lineup_json(self.fetch_json(lineup_api_url, game_number, "lineup"))
+        home_info, away_info = self.teams[game_number]
+
+        timeline, complete = parse_relay_json(self.fetch_json(relay_api_url, game_number, "relay"), stop_fingerprint)
+        logger.info(f"Relay fetched: game={game_number}, timeline={len(timeline)}, complete={complete}, "
+                    f"{(time.perf_counter() - started) * 1000:.0f}ms")
+        return RelayResult(players, home_info, away_info, timeline, complete)
+
+    def close(self):
+        self.session.close()
+
+
+class SeleniumRelayFetcher:
+    """
+    Chrome 으로 페이지를 열고 타임라인 버튼을 모두 펼친 뒤 렌더링된 HTML 을 lxml 파서로 처리
+    JSON API 를 쓸 수 없을 때의 대안 (SPORTS_SCRAPER_MODE=selenium)
+    """
+
+    def __init__(self, driver=None, wait_seconds: float = 10):
+        from selenium import webdriver
+
+        self.driver = driver or webdriver.Chrome()
+        self.wait_seconds = wait_seconds
+
+    def load_page(self, url: str):
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+
+        self.driver.get(url)
+        return WebDriverWait(self.driver, self.wait_seconds).until(
+            EC.presence_of_element_located((By.ID, "content"))
+        )
+
+    def fetch(self, game_number: str, stop_fingerprint: str = None, with_lineup: bool = True):
+        from selenium.webdriver.common.by import By
+
+        players = None
+        if with_lineup:
+            self.load_page(lineup_url.format(game_number=game_number))
+            players = parse_lineup_html(self.driver.page_source)
+
+        from selenium.webdriver.support.ui import WebDriverWait
+
+        content = self.load_page(relay_url.format(game_number=game_number))
+        for button in content.find_elements(By.CSS_SELECTOR, "a[class*='TimeLine_button'][aria-pressed='false']"):
+            button.click()
+            # 고정 대기 대신 버튼이 펼쳐진 상태가 될 때까지만 기다린다
+            WebDriverWait(self.driver, self.wait_seconds).until(
+                lambda driver: button.get_attribute("aria-pressed") == "true")
+
+        home_info, away_info, timeline, complete = parse_relay_html(self.driver.page_source, stop_fingerprint)
+        return RelayResult(players, home_info, away_info, timeline, complete)
+
+    def close(self):
+        self.driver.quit()
+
+
+def create_fetcher(mode: str = None):
+    # SPORTS_SCRAPER_MODE: http(기본, JSON API) / selenium
+    # SPORTS_FIXTURE_DIR 는 저장된 JSON 을 대신 읽고, SPORTS_FIXTURE_SAVE_DIR 는 받은 JSON 을 저장
+    mode = mode or os.getenv("SPORTS_SCRAPER_MODE", "http")
+    if mode == "selenium":
+        return SeleniumRelayFetcher()
+    return HttpRelayFetcher(fixture_dir=os.getenv("SPORTS_FIXTURE_DIR"),
+                            save_dir=os.getenv("SPORTS_FIXTURE_SAVE_DIR"))
+
+
+if __name__ == "__main__":
+    # 저장된 fixture 파싱 확인: python naver_relay.py <fixture_dir> <game_number>
+    import sys
+
+    fixture_dir, game_number = sys.argv[1], sys.argv[2]
+    relay = HttpRelayFetcher(fixture_dir=fixture_dir).fetch(game_number)
+    print(f"players={len(relay.players)}, timeline={len(relay.timeline)}, "
+          f"highlight={len(build_match_data(relay.home_info, relay.away_info, relay.timeline)[1]['timeline'])}")
@@ -0,0 +1,157 @@
+################################################
+# ai_stt / ai_tts 조회
+################################################
+
+async def find_stt_answer(db, voice_file_name: str):
+    async with db.cursor() as cursor:
+        await cursor.execute("""
+            select
+                s.voice_file_name,
+                s.client_stt_question,
+                case
+                    when s.answer_type = 1 then 'btv-search'
+                    when s.answer_type = 2 then 'weather'
+                    else 'ai-answer'
+                end answer_type,
+                s.ai_chat_answer,
+                s.tts_id,
+                t.client_tts_text,
+                t.voice_file_url,
+                t.response_status
+            from ai_stt s
+            left join ai_tts t on t.id = s.tts_id
+            where s.voice_file_name = %s
+        """, voice_file_name)
+        return await cursor.fetchone()
+
+
+async def find_ready_tts_by_text(db, client_tts_text: str):
+    async with db.cursor() as cursor:
+        await cursor.execute("""
+            select
+                id,
+                client_tts_text,
+                voice_file_url,
+                input_type,
+                response_status,
+                insert_user,
+                insert_timestamp,
+                update_user,
+                update_timestamp
+            from ai_tts
+            where response_status = 1
+            and input_type = 3
+            and client_tts_text = %s
+            order by input_type, id desc
+            limit 1
+        """, client_tts_text)
+        return await cursor.fetchone()
+
+
+async def claim_next_tts(db, input_type: str = None, claim_timeout: int = 60):
+    # 대기(1) 또는 확인 시간이 지난 점유(3) 항목 하나를 잠그고 점유 상태로 변경
+    input_type_filter = "and input_type = %s" if input_type else ""
+    params = (claim_timeout, input_type) if input_type else (claim_timeout,)
+
+    async with db.transaction() as cursor:
+        await cursor.execute(f"""
+            select
+                id,
+                client_tts_text,
+                voice_file_url,
+                input_type
+            from ai_tts
+            where (
+                response_status = 1
+                or (response_status = 3 and claim_timestamp < now() - interval %s second)
+            )
+            {input_type_filter}
+            order by input_type, id desc
+            limit 1
+            for update skip locked
+        """, params)
+        result = await cursor.fetchone()
+
+        if result:
+            await cursor.execute("""
+                update ai_tts set response_status = 3, claim_timestamp = now()
+                where id = %s
+            """, result.get("id"))
+        return result
+
+
+async def count_ready_tts(db):
+    async with db.cursor() as cursor:
+        await cursor.execute("""
+            select input_type,
+                   count(*) count
+            from ai_tts
+            where response_status = 1
+            group by input_type
+        """)
+        return {f"{row.get('input_type')}": row.get("count") for row in await cursor.fetchall()}
+
+
+async def update_tts_response_status(db, tts_id: int):
+    async with db.cursor() as cursor:
+        await cursor.execute("""
+            update ai_tts set response_status = 2
+            where id = %s
+        """, tts_id)
+
+
+################################################
+# vr_golf_course / vr_golf_course_hole 조회
+################################################
+
+async def find_all_golf_courses(db):
+    async with db.cursor() as cursor:
+        await cursor.execute("""
+             select course_id,
+                    course_name,
+                    total_hole_numbers,
+                    total_distance,
+                    course_level,
+                    green_level,
+                    address,
+                    homepage,
+                    tel_no,
+                    weather_nx,
+                    weather_ny,
+                    update_timestamp
+             from vr_golf_course
+        """)
+        return await cursor.fetchall()
+
+
+async def find_all_golf_course_holes(db):
+    async with db.cursor() as cursor:
+        await cursor.execute("""
+             select course_id,
+                    hole_id,
+                    hole_type,
+                    hole_number,
+                    par_score,
+                    hdcp,
+                    back_tee,
+                    champ_tee,
+                    front_tee,
+                    senior_tee,
+                    lady_tee,
+                    map_image_link,
+                    map_video_link,
+                    voice_file_name,
+                    voice_text,
+                    tee_box_lat,
+                    tee_box_long,
+                    hole_cup_lat,
+                    hole_cup_long,
+                    update_timestamp
+             from vr_golf_course_hole
+             order by course_id, hole_id
+        """)
+        return await cursor.fetchall()
+
+
+async def load_golf_index(db):
+    return await find_all_golf_courses(db), await find_all_golf_course_holes(db)
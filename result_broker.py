@@ -0,0 +1,76 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+
+
+class ResultBroker:
+    """
+    voice_file_name 별 처리 결과를 구독자에게 전달하는 프로세스 내부 pub/sub
+    워커 스레드에서 publish 해도 안전하며, 구독 전에 발행된 결과는 보관 기간 동안 바로 전달된다
+    """
+
+    def __init__(self, retention_seconds: int = 300, max_results: int = 10000):
+        self.retention_seconds = retention_seconds
+        self.max_results = max_results
+        self.results = OrderedDict()  # key -> (published_at, payload)
+        self.subscribers = {}  # key -> [(loop, future)]
+        self.lock = threading.Lock()
+
+    def publish(self, key: str, payload: dict):
+        with self.lock:
+            self.results[key] = (time.monotonic(), payload)
+            self.results.move_to_end(key)
+            self._expire()
+            waiters = self.subscribers.pop(key, [])
+
+        for loop, future in waiters:
+            loop.call_soon_threadsafe(self._resolve, future, payload)
+
+    def get(self, key: str):
+        with self.lock:
+            self._expire()
+            entry = self.results.get(key)
+            return entry[1] if entry else None
+
+    async def wait(self, key: str, timeout: float):
+        loop = asyncio.get_running_loop()
+        with self.lock:
+            self._expire()
+            entry = self.results.get(key)
+            if entry:
+                return entry[1]
+            future = loop.create_future()
+            self.subscribers.setdefault(key, []).append((loop, future))
+
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            return None
+        finally:
+            with self.lock:
+                waiters = self.subscribers.get(key)
+                if waiters and (loop, future) in waiters:
+                    waiters.remove((loop, future))
+                    if not waiters:
+                        del self.subscribers[key]
+
+    def stats(self):
+        with self.lock:
+            return {
+                "results": len(self.results),
+                "subscribers": sum(len(waiters) for waiters in self.subscribers.values()),
+            }
+
+    @staticmethod
+    def _resolve(future, payload):
+        if not future.done():
+            future.set_result(payload)
+
+    def _expire(self):
+        now = time.monotonic()
+        while self.results:
+            key, (published_at, _) = next(iter(self.results.items()))
+            if now - published_at <= self.retention_seconds and len(self.results) <= self.max_results:
+                break
+            del self.results[key]
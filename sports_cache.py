@@ -0,0 +1,196 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, replace
+from email.utils import formatdate, parsedate_to_datetime
+
+
+def etag_matches(if_none_match: str, *etags: str):
+    # If-None-Match 의 태그 목록(약한 비교, W/ 무시, *) 중 하나라도 etags 와 같으면 True
+    if not if_none_match:
+        return False
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in tags or any(etag in tags for etag in etags)
+
+
+@dataclass(frozen=True, slots=True)
+class SportsFile:
+    mtime_ns: int
+    size: int
+    body: bytes
+    etag: str
+    last_modified: str
+    gzip_body: bytes = None  # 스크래퍼가 함께 쓴 {path}.gz
+
+    @property
+    def gzip_etag(self):
+        return f'{self.etag[:-1]}-gzip"'
+
+    def is_not_modified(self, if_none_match: str = None, if_modified_since: str = None):
+        # If-None-Match 가 있으면 ETag 로만 비교
+        if if_none_match:
+            return etag_matches(if_none_match, self.etag, self.gzip_etag)
+        if if_modified_since:
+            try:
+                since = parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+            return self.mtime_ns // 1_000_000_000 <= since
+        return False
+
+
+class SportsFileCache:
+    """
+    {channel_id}_{file_type}.json 경기 요약 파일을 bytes 로 메모리에 보관
+    check_interval 초마다 mtime/size 를 확인해 스크래퍼가 새로 쓴 경우에만 다시 읽는다
+    같은 버전의 .gz 사본(본 파일보다 mtime 이 같거나 늦은 것)이 있으면 함께 보관한다
+    timeline 증분 조회를 위해 파싱한 timeline 도 파일 버전별로 한 번만 만든다
+    """
+
+    def __init__(self, directory: str, check_interval: float = 1.0, max_entries: int = 1000):
+        self.directory = directory
+        self.check_interval = check_interval
+        self.max_entries = max_entries
+        self.entries = {}  # (channel_id, file_type) -> SportsFile
+        self.checked_at = {}  # (channel_id, file_type) -> 마지막 확인 시각
+        self.timelines = {}  # (channel_id, file_type) -> (ETag, timeline, 앞부분 해시 목록)
+        self.hits = 0
+        self.reloads = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def path_for(self, channel_id: int, file_type: str):
+        return os.path.join(self.directory, f"{channel_id}_{file_type}.json")
+
+    def get(self, channel_id: int, file_type: str):
+        key = (channel_id, file_type)
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry and now - self.checked_at.get(key, 0) < self.check_interval:
+                self.hits += 1
+                return entry
+
+        path = self.path_for(channel_id, file_type)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            with self.lock:
+                self.entries.pop(key, None)
+                self.checked_at.pop(key, None)
+                self.timelines.pop(key, None)
+                self.misses += 1
+            return None
+
+        if entry and entry.mtime_ns == stat.st_mtime_ns and entry.size == stat.st_size:
+            # .gz 는 본 파일보다 나중에 바뀌므로 아직 없으면 다시 확인
+            if entry.gzip_body is None:
+                gzip_body = self._load_gzip(path, entry.mtime_ns)
+                if gzip_body is not None:
+                    entry = replace(entry, gzip_body=gzip_body)
+            with self.lock:
+                if key in self.entries:
+                    self.entries[key] = entry
+                self.checked_at[key] = now
+                self.hits += 1
+            return entry
+
+        with open(path, 'rb') as f:
+            body = f.read()
+        entry = SportsFile(
+            mtime_ns=stat.st_mtime_ns,
+            size=stat.st_size,
+            body=body,
+            etag=f'"{hashlib.sha1(body).hexdigest()}"',
+            last_modified=formatdate(stat.st_mtime, usegmt=True),
+            gzip_body=self._load_gzip(path, stat.st_mtime_ns),
+        )
+
+        with self.lock:
+            if key not in self.entries and len(self.entries) >= self.max_entries:
+                oldest = min(self.checked_at, key=self.checked_at.get)
+                self.entries.pop(oldest, None)
+                self.checked_at.pop(oldest, None)
+                self.timelines.pop(oldest, None)
+            self.entries[key] = entry
+            self.checked_at[key] = now
+            self.reloads += 1
+        return entry
+
+    def _load_gzip(self, path: str, mtime_ns: int):
+        gzip_path = f"{path}.gz"
+        try:
+            if os.stat(gzip_path).st_mtime_ns < mtime_ns:
+                return None
+            with open(gzip_path, 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def get_timeline(self, channel_id: int, file_type: str):
+        # (파일, timeline, 앞부분 해시 목록) 반환, prefixes[i] 는 timeline[:i] 의 해시
+        sports_file = self.get(channel_id, file_type)
+        if sports_file is None:
+            return None, (), ()
+
+        key = (channel_id, file_type)
+        with self.lock:
+            cached = self.timelines.get(key)
+        if cached and cached[0] == sports_file.etag:
+            return sports_file, cached[1], cached[2]
+
+        timeline = tuple(json.loads(sports_file.body).get("timeline") or ())
+        prefix = hashlib.sha1()
+        prefixes = [prefix.hexdigest()[:16]]
+        for time_line in timeline:
+            prefix.update(json.dumps(time_line, ensure_ascii=False, sort_keys=True).encode("utf-8"))
+            prefixes.append(prefix.hexdigest()[:16])
+        prefixes = tuple(prefixes)
+
+        with self.lock:
+            if key in self.entries:
+                self.timelines[key] = (sports_file.etag, timeline, prefixes)
+        return sports_file, timeline, prefixes
+
+    def get_timeline_delta(self, channel_id: int, file_type: str, since: int = 0, prefix: str = None,
+                           version: str = None):
+        return make_timeline_delta(self.get_timeline(channel_id, file_type), since, prefix, version)
+
+    def stats(self):
+        with self.lock:
+            return {
+                "entries": len(self.entries),
+                "bytes": sum(entry.size for entry in self.entries.values()),
+                "gzip_bytes": sum(len(entry.gzip_body or b"") for entry in self.entries.values()),
+                "hits": self.hits,
+                "reloads": self.reloads,
+                "misses": self.misses,
+            }
+
+
+def make_timeline_delta(snapshot, since: int = 0, prefix: str = None, version: str = None):
+    # get_timeline 결과에서 since 이후에 추가된 timeline 항목만 반환
+    # prefix 는 클라이언트가 받은 timeline[:since] 의 해시(직전 응답의 prefix)로,
+    # 이미 보낸 항목이 바뀌었거나(LLM 보강, 재수집) 더 짧아지면 reset 과 함께 처음부터 다시 보낸다
+    sports_file, timeline, prefixes = snapshot
+    if sports_file is None:
+        return None
+
+    current_version = sports_file.etag.strip('"')
+    since = max(since, 0)
+    reset = since > len(timeline)
+    if not reset and prefix and version != current_version:
+        reset = prefixes[since] != prefix
+
+    start = 0 if reset else since
+    return {
+        "result": "success",
+        "since": start,
+        "next": len(timeline),
+        "reset": reset,
+        "version": current_version,
+        "prefix": prefixes[len(timeline)],
+        "timeline": list(timeline[start:]),
+    }
@@ -0,0 +1,172 @@
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from dotenv import load_dotenv
+
+from naver_relay import MatchState, create_fetcher
+
+logger = logging.getLogger(__name__)
+
+
+def parse_matches(value: str):
+    # "게임번호:채널번호,게임번호:채널번호" -> [(게임번호, 채널번호), ...]
+    matches = []
+    for item in (value or "").split(","):
+        item = item.strip()
+        if not item:
+            continue
+        game_number, channel_number = item.split(":", 1)
+        matches.append((game_number.strip(), channel_number.strip()))
+    return matches
+
+
+class SportsScraperService:
+    """
+    여러 경기(게임번호, 채널번호)를 interval 초마다 갱신하는 상주 스크래퍼
+    fetcher(HTTP 세션 또는 Chrome)는 pool_size 개까지만 만들어 경기 간에 재사용한다
+    경기마다 MatchState 를 유지해 새 중계 항목만 파싱하고, 바뀐 파일만 다시 쓴다
+    """
+
+    def __init__(self, matches, output_dir: str, interval_seconds: float = 30, pool_size: int = 4,
+                 mode: str = None):
+        self.matches = list(matches)
+        self.output_dir = output_dir
+        self.interval_seconds = interval_seconds
+        self.pool_size = pool_size
+        self.mode = mode
+
+        self.fetchers = queue.Queue()
+        self.fetcher_count = 0
+        self.executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="scraper")
+        self.in_flight = set()
+        self.match_stats = {}  # 게임번호 -> 마지막 수집 결과
+        self.match_states = {}  # 게임번호 -> MatchState
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+
+    def acquire_fetcher(self):
+        try:
+            return self.fetchers.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self.lock:
+            can_create = self.fetcher_count < self.pool_size
+            if can_create:
+                self.fetcher_count += 1
+        if can_create:
+            try:
+                return create_fetcher(self.mode)
+            except Exception:
+                with self.lock:
+                    self.fetcher_count -= 1
+                raise
+        return self.fetchers.get()
+
+    def release_fetcher(self, fetcher, broken: bool = False):
+        if not broken:
+            self.fetchers.put(fetcher)
+            return
+
+        # 오류가 난 fetcher 는 닫고 다음 요청 때 새로 만든다
+        with self.lock:
+            self.fetcher_count -= 1
+        try:
+            fetcher.close()
+        except Exception as e:
+            logger.error(f"Error close fetcher: {e}")
+
+    def refresh_match(self, game_number: str, channel_number: str):
+        started = time.perf_counter()
+        fetcher = self.acquire_fetcher()
+        broken = False
+        try:
+            state = self.match_states.get(game_number)
+            if state is None:
+                state = self.match_states[game_number] = MatchState(self.output_dir, channel_number)
+
+            # 라인업은 처음 한 번만 받는다
+            relay = fetcher.fetch(game_number, state.last_fingerprint, with_lineup=state.players is None)
+            changed = state.apply(relay)
+            if changed:
+                state.save(changed)
+            self.record(game_number, channel_number, started, timeline=len(state.timeline),
+                        new_events=len(relay.timeline) if not relay.complete else None)
+        except Exception as e:
+            broken = True
+            logger.error(f"Error refresh match {game_number}/{channel_number}: {e}")
+            self.record(game_number, channel_number, started, error=str(e))
+        finally:
+            self.release_fetcher(fetcher, broken)
+            with self.lock:
+                self.in_flight.discard(game_number)
+
+    def record(self, game_number: str, channel_number: str, started: float, timeline: int = None,
+               new_events: int = None, error: str = None):
+        with self.lock:
+            previous = self.match_stats.get(game_number, {})
+            self.match_stats[game_number] = {
+                "channel_number": channel_number,
+                "runs": previous.get("runs", 0) + 1,
+                "errors": previous.get("errors", 0) + (1 if error else 0),
+                "timeline": timeline if timeline is not None else previous.get("timeline"),
+                "new_events": new_events,
+                "last_error": error,
+                "last_refresh": time.time(),
+                "elapsed_ms": round((time.perf_counter() - started) * 1000),
+            }
+
+    def schedule(self):
+        # 이전 갱신이 끝나지 않은 경기는 건너뛴다
+        for game_number, channel_number in self.matches:
+            with self.lock:
+                if game_number in self.in_flight:
+                    continue
+                self.in_flight.add(game_number)
+            self.executor.submit(self.refresh_match, game_number, channel_number)
+
+    def run(self):
+        logger.info(f"Sports scraper started: matches={len(self.matches)}, pool={self.pool_size}, "
+                    f"interval={self.interval_seconds}s")
+        while not self.stopped.is_set():
+            started = time.monotonic()
+            self.schedule()
+            self.stopped.wait(max(self.interval_seconds - (time.monotonic() - started), 0))
+
+    def stop(self):
+        self.stopped.set()
+        self.executor.shutdown(wait=True)
+        while not self.fetchers.empty():
+            self.release_fetcher(self.fetchers.get_nowait(), broken=True)
+
+    def stats(self):
+        with self.lock:
+            return {
+                "matches": len(self.matches),
+                "fetchers": self.fetcher_count,
+                "in_flight": len(self.in_flight),
+                "match": dict(self.match_stats),
+            }
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO)
+
+    # SPORTS_MATCHES="2024042810041763599:1,2024041951048615703:978"
+    service = SportsScraperService(
+        parse_matches(os.getenv("SPORTS_MATCHES")),
+        os.getenv("VOICE_FOLDER") or os.getcwd(),
+        float(os.getenv("SPORTS_REFRESH_SECONDS", "30")),
+        int(os.getenv("SPORTS_SCRAPER_POOL", "4")),
+    )
+    try:
+        service.run()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.stop()
@@ -0,0 +1,105 @@
+import asyncio
+import logging
+import time
+
+from starlette.concurrency import run_in_threadpool
+
+from sports_cache import SportsFileCache, make_timeline_delta
+
+logger = logging.getLogger(__name__)
+
+
+def file_version(snapshot):
+    return snapshot[0].etag if snapshot[0] is not None else None
+
+
+class TimelineWatch:
+    def __init__(self):
+        self.snapshot = None  # get_timeline 결과, 처음 확인 전에는 None
+        self.changed = asyncio.Event()
+        self.waiters = 0
+        self.task = None
+
+
+class SportsTimelineWatcher:
+    """
+    (channel_id, file_type) 별로 태스크 하나만 check_interval 초마다 파일 변경을 확인하고,
+    바뀌면 기다리던 요청을 모두 깨운다. 요청은 메모리의 최신 timeline 으로 증분을 만들므로
+    접속자 수와 관계없이 파일 확인용 스레드 호출은 경기당 주기마다 한 번이다
+    기다리는 요청이 없어지면 태스크도 끝난다
+    """
+
+    def __init__(self, files: SportsFileCache, check_interval: float = 1.0):
+        self.files = files
+        self.check_interval = check_interval
+        self.watches = {}  # (channel_id, file_type) -> TimelineWatch
+        self.checks = 0
+        self.wakeups = 0
+
+    async def wait(self, channel_id: int, file_type: str, since: int = 0, timeout: float = 0, prefix: str = None,
+                   version: str = None):
+        # 새 timeline 항목이 생기거나(이미 보낸 항목이 바뀌면 reset) timeout 이 지날 때까지 기다린다
+        key = (channel_id, file_type)
+        watch = self.watches.get(key)
+        if watch is None and timeout <= 0:
+            snapshot = await run_in_threadpool(self.files.get_timeline, channel_id, file_type)
+            return make_timeline_delta(snapshot, since, prefix, version)
+
+        if watch is None:
+            watch = self.watches[key] = TimelineWatch()
+            watch.task = asyncio.create_task(self._watch(key, watch))
+
+        deadline = time.monotonic() + timeout
+        watch.waiters += 1
+        try:
+            while True:
+                changed = watch.changed
+                if watch.snapshot is not None:
+                    delta = make_timeline_delta(watch.snapshot, since, prefix, version)
+                    if delta is None or delta["timeline"] or delta["reset"] or time.monotonic() >= deadline:
+                        return delta
+                try:
+                    await asyncio.wait_for(changed.wait(), max(deadline - time.monotonic(), 0))
+                except asyncio.TimeoutError:
+                    if watch.snapshot is None:
+                        snapshot = await run_in_threadpool(self.files.get_timeline, channel_id, file_type)
+                        return make_timeline_delta(snapshot, since, prefix, version)
+        finally:
+            watch.waiters -= 1
+
+    async def _watch(self, key, watch: TimelineWatch):
+        try:
+            while True:
+                try:
+                    snapshot = await run_in_threadpool(self.files.get_timeline, *key)
+                except Exception as e:
+                    logger.error(f"Error watch sports timeline {key}: {e}")
+                    snapshot = (None, (), ())
+                self.checks += 1
+
+                if watch.snapshot is None or file_version(snapshot) != file_version(watch.snapshot):
+                    watch.snapshot = snapshot
+                    watch.changed.set()
+                    watch.changed = asyncio.Event()
+                    self.wakeups += 1
+
+                await asyncio.sleep(self.check_interval)
+                if watch.waiters <= 0:
+                    return
+        finally:
+            if self.watches.get(key) is watch:
+                del self.watches[key]
+
+    async def stop(self):
+        tasks = [watch.task for watch in self.watches.values()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self):
+        return {
+            "watches": len(self.watches),
+            "waiters": sum(watch.waiters for watch in self.watches.values()),
+            "checks": self.checks,
+            "wakeups": self.wakeups,
+        }
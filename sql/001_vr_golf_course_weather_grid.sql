@@ -0,0 +1,4 @@
+-- 골프장별 기상청 예보 격자 좌표
+alter table vr_golf_course
+    add column weather_nx int not null default 62 comment '기상청 예보 격자 X',
+    add column weather_ny int not null default 120 comment '기상청 예보 격자 Y';
@@ -0,0 +1,11 @@
+-- STT 결과에서 답변 음성(ai_tts)을 직접 참조
+alter table ai_stt
+    add column tts_id bigint null comment '답변 음성 ai_tts.id' after ai_chat_answer,
+    add constraint fk_ai_stt_tts_id foreign key (tts_id) references ai_tts (id);
+
+-- /api/ai/result 조회용
+create index idx_ai_stt_voice_file_name on ai_stt (voice_file_name);
+
+-- /api/tts/result, 이전 데이터(tts_id 없음) 조회용
+create index idx_ai_tts_status_type on ai_tts (response_status, input_type, id);
+create index idx_ai_tts_text on ai_tts (client_tts_text(191), response_status, input_type);
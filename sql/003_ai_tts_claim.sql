@@ -0,0 +1,4 @@
+-- /api/tts/result 점유(claim) 처리
+-- response_status: 1 대기, 2 수신완료, 3 점유(수신 확인 전)
+alter table ai_tts
+    add column claim_timestamp datetime null comment '점유 시각' after response_status;
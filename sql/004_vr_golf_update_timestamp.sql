@@ -0,0 +1,8 @@
+-- 골프장 스냅샷(/api/vr/golf/{course_id}/snapshot) 캐시 무효화 기준
+alter table vr_golf_course
+    add column update_timestamp timestamp not null default current_timestamp on update current_timestamp;
+
+alter table vr_golf_course_hole
+    add column update_timestamp timestamp not null default current_timestamp on update current_timestamp;
+
+create index idx_vr_golf_course_hole_course on vr_golf_course_hole (course_id, hole_id);
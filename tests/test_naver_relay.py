@@ -0,0 +1,57 @@
+import os
+
+from naver_relay import HttpRelayFetcher, MatchState, build_match_data
+
+fixture_dir = os.path.join(os.path.dirname(__file__), "fixtures", "naver_relay")
+game_number = "2024041951048615703"
+
+
+def test_parse_full_relay():
+    relay = HttpRelayFetcher(fixture_dir=fixture_dir).fetch(game_number)
+
+    assert relay.complete
+    assert relay.home_info == {"name": "울산", "logo": "https://sports-phinf.pstatic.net/team/kleague/default/35.png"}
+    assert relay.away_info["name"] == "전북"
+    assert relay.players["주민규"] == "home"
+    assert relay.players["문선민"] == "away"
+
+    # 시간순, 공백 정리
+    assert [time_line["time"] for time_line in relay.timeline] == ["1'", "12'", "31'", "HT", "63'", "75'", "88'", ""]
+    assert relay.timeline[2] == {"time": "31'", "desc": "이청용의 크로스를 주민규가 헤더로 마무리합니다",
+                                 "type": "none", "state": "goal", "name": "주민규"}
+    assert relay.timeline[0] == {"time": "1'", "desc": "경기 시작", "type": "none"}
+    assert [time_line.get("state") for time_line in relay.timeline[3:]] == \
+        ["quarter_finish1", "goal", "change", "card1", "quarter_finish2"]
+    assert relay.timeline[5]["in"] == "" and relay.timeline[5]["out"] == ""
+
+    _, match_highlight_data = build_match_data(relay.home_info, relay.away_info, relay.timeline)
+    assert len(match_highlight_data["timeline"]) == 5
+
+
+def test_incremental_relay(tmp_path):
+    fetcher = HttpRelayFetcher(fixture_dir=fixture_dir)
+    full = fetcher.fetch(game_number)
+
+    # 63' 항목까지 수집해 둔 상태에서 이어서 수집
+    state = MatchState(str(tmp_path), "978")
+    state.players = full.players
+    state.home_info, state.away_info = full.home_info, full.away_info
+    state.timeline = list(full.timeline[:5])
+
+    relay = fetcher.fetch(game_number, state.last_fingerprint, with_lineup=False)
+    assert not relay.complete
+    assert relay.players is None
+    assert [time_line["time"] for time_line in relay.timeline] == ["75'", "88'", ""]
+
+    assert state.apply(relay) == ["realtime", "highlight"]
+    assert state.timeline == full.timeline
+    state.save(["realtime", "highlight"])
+    assert os.path.exists(tmp_path / "978_realtime.json")
+
+    # 새 항목이 없으면 다시 쓰지 않는다
+    relay = fetcher.fetch(game_number, state.last_fingerprint, with_lineup=False)
+    assert not relay.complete and relay.timeline == []
+    assert state.apply(relay) == []
+
+    # 다시 시작해도 저장된 파일에서 이어서 수집
+    assert MatchState(str(tmp_path), "978").last_fingerprint == state.last_fingerprint
@@ -0,0 +1,178 @@
+import json
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+
+def needs_enrichment(time_line):
+    return time_line.get("state") == "change" or time_line.get("type") in ["", "none"]
+
+
+def apply_enrichment(time_line, new_time_line):
+    # LLM 응답을 검증해 timeline 항목에 반영, 형식이 맞지 않으면 ValueError
+    new_type = new_time_line.get("team", "none")
+    new_time = f"{new_time_line.get('time', '0')}"
+
+    if int(new_time.replace("'", "").replace("none", "0")) <= 0:
+        return
+    if new_type not in ["none", "home", "away"]:
+        raise ValueError(f"invalid team: {new_type}")
+    if time_line.get("state") == "change" and (not new_time_line.get("in") or not new_time_line.get("out")):
+        raise ValueError("change without in/out")
+
+    time_line["type"] = new_type
+    if time_line.get("state") == "change":
+        time_line["in"] = new_time_line.get("in")
+        time_line["out"] = new_time_line.get("out")
+
+
+class MalformedAnswerError(ValueError):
+    """
+    LLM 응답이 JSON 이 아니거나 항목 수가 맞지 않는 경우
+    """
+
+
+class RateLimiter:
+    """
+    초당 rate 회로 호출을 제한하는 토큰 버킷 (스레드 안전)
+    """
+
+    def __init__(self, rate_per_second: float, burst: int = 1):
+        self.rate = rate_per_second
+        self.burst = burst
+        self.tokens = burst
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        if self.rate <= 0:
+            return
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait_seconds = (1 - self.tokens) / self.rate
+            time.sleep(wait_seconds)
+
+
+class TimelineEnricher:
+    """
+    timeline 항목의 team(type)/in/out 을 LLM 으로 채운다
+    batch_size 개씩 한 프롬프트로 묶어 concurrency 개까지 동시에 호출하고,
+    호출 오류는 지수 백오프로 max_retries 회까지 같은 묶음을 재시도하고,
+    묶음 응답 형식이 맞지 않을 때(MalformedAnswerError)만 항목별로 나눠 다시 호출한다
+    llm 은 프롬프트 문자열을 받아 응답 문자열을 반환하는 함수(예: OpenAI().invoke)
+    build_prompt(time_lines) 는 항목이 하나면 JSON 객체, 여럿이면 같은 순서의 JSON 배열을 요청하는 프롬프트를 만든다
+    """
+
+    def __init__(self, llm, build_prompt, concurrency: int = 4, rate_per_second: float = 2, batch_size: int = 5,
+                 max_retries: int = 3, backoff_seconds: float = 1):
+        self.llm = llm
+        self.build_prompt = build_prompt
+        self.concurrency = concurrency
+        self.rate_limiter = RateLimiter(rate_per_second, burst=concurrency)
+        self.batch_size = max(batch_size, 1)
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+
+    def invoke(self, time_lines):
+        self.rate_limiter.acquire()
+        answer = self.llm(self.build_prompt(time_lines))
+        try:
+            result = json.loads(answer)
+        except (TypeError, ValueError) as e:
+            raise MalformedAnswerError(f"invalid json: {e}")
+        if len(time_lines) == 1:
+            return [result[0] if isinstance(result, list) and len(result) == 1 else result]
+        if not isinstance(result, list) or len(result) != len(time_lines):
+            raise MalformedAnswerError(f"expected {len(time_lines)} results")
+        return result
+
+    def backoff(self, attempt: int):
+        time.sleep(self.backoff_seconds * 2 ** (attempt - 1) * (1 + random.random() * 0.1))
+
+    def enrich_one(self, index: int, time_line):
+        started = time.perf_counter()
+        error = None
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                apply_enrichment(time_line, self.invoke([time_line])[0])
+                return self.report(index, started, attempt)
+            except Exception as e:
+                error = e
+                if attempt < self.max_retries:
+                    self.backoff(attempt)
+
+        logger.error(f"Error enrich timeline {index} ({time_line.get('time')}): {error}")
+        return self.report(index, started, self.max_retries, f"{error}")
+
+    def enrich_batch(self, batch):
+        if len(batch) == 1:
+            return [self.enrich_one(*batch[0])]
+
+        started = time.perf_counter()
+        new_time_lines = None
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                new_time_lines = self.invoke([time_line for _, time_line in batch])
+                break
+            except MalformedAnswerError as e:
+                logger.warning(f"Batch answer malformed, retry each: {e}")
+                return [self.enrich_one(index, time_line) for index, time_line in batch]
+            except Exception as e:
+                # 일시적인 오류(속도 제한 등)는 항목별로 나누지 않고 묶음 그대로 재시도
+                if attempt == self.max_retries:
+                    logger.error(f"Error enrich timeline batch ({len(batch)} events): {e}")
+                    return [self.report(index, started, attempt, f"{e}") for index, _ in batch]
+                self.backoff(attempt)
+
+        reports = []
+        for (index, time_line), new_time_line in zip(batch, new_time_lines):
+            try:
+                apply_enrichment(time_line, new_time_line)
+                reports.append(self.report(index, started, 1))
+            except Exception:
+                reports.append(self.enrich_one(index, time_line))
+        return reports
+
+    def enrich(self, timeline):
+        # timeline 항목을 제자리에서 수정하고 항목별 결과(지연 시간, 시도 횟수)를 반환
+        targets = [(index, time_line) for index, time_line in enumerate(timeline) if needs_enrichment(time_line)]
+        batches = [targets[i:i + self.batch_size] for i in range(0, len(targets), self.batch_size)]
+
+        started = time.perf_counter()
+        reports = []
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="enrich") as executor:
+            for batch_reports in executor.map(self.enrich_batch, batches):
+                reports.extend(batch_reports)
+
+        logger.info(f"Timeline enriched: {self.summary(reports, time.perf_counter() - started)}")
+        return reports
+
+    @staticmethod
+    def report(index: int, started: float, attempts: int, error: str = None):
+        return {
+            "index": index,
+            "latency_ms": round((time.perf_counter() - started) * 1000),
+            "attempts": attempts,
+            "error": error,
+        }
+
+    @staticmethod
+    def summary(reports, elapsed: float = None):
+        latencies = sorted(report.get("latency_ms") for report in reports)
+        return {
+            "events": len(reports),
+            "failed": sum(1 for report in reports if report.get("error")),
+            "avg_ms": round(sum(latencies) / len(latencies)) if latencies else 0,
+            "p95_ms": latencies[int(len(latencies) * 0.95)] if latencies else 0,
+            "elapsed_ms": round(elapsed * 1000) if elapsed is not None else None,
+        }
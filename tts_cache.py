@@ -0,0 +1,118 @@
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import unicodedata
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+class TtsCache:
+    """
+    문장과 음성 옵션의 해시를 키로 생성된 음성 파일을 STATIC_FOLDER 하위에 보관하는 캐시
+    최근 사용 순서(LRU)로 관리하며 전체 용량 또는 파일 개수를 넘으면 오래된 파일부터 삭제한다
+    """
+
+    def __init__(self, directory: str, base_url: str, max_bytes: int, max_files: int):
+        self.directory = directory
+        self.base_url = base_url
+        self.max_bytes = max_bytes
+        self.max_files = max_files
+        self.entries = OrderedDict()  # key -> (file_name, size)
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+        os.makedirs(self.directory, exist_ok=True)
+        self._load()
+
+    @staticmethod
+    def make_key(text: str, language: str, provider: str, option: str, rate: int, pitch: int):
+        normalized_text = " ".join(unicodedata.normalize("NFC", text).split())
+        raw_key = json.dumps([normalized_text, language, provider, option, rate, pitch], ensure_ascii=False)
+        return hashlib.sha256(raw_key.encode("utf-8")).hexdigest()
+
+    def get(self, key: str):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None or not os.path.exists(os.path.join(self.directory, entry[0])):
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.url_for(entry[0])
+
+    def put(self, key: str, audio: bytes, extension: str = "mp3"):
+        file_name = f"{key}.{extension}"
+        file_path = os.path.join(self.directory, file_name)
+        # 같은 키를 동시에 쓰는 워커끼리 임시 파일이 겹치지 않도록 고유한 이름 사용
+        fd, temp_path = tempfile.mkstemp(prefix=f".{file_name}.", suffix=".tmp", dir=self.directory)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(audio)
+            os.chmod(temp_path, 0o644)
+            os.replace(temp_path, file_path)
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except FileNotFoundError:
+                pass
+            raise
+
+        with self.lock:
+            if key in self.entries:
+                self._remove(key, delete_file=False)
+            self.entries[key] = (file_name, len(audio))
+            self.total_bytes += len(audio)
+            self._evict()
+        return self.url_for(file_name)
+
+    def url_for(self, file_name: str):
+        return f"{self.base_url}/static/{os.path.basename(self.directory)}/{file_name}"
+
+    def stats(self):
+        return {
+            "files": len(self.entries),
+            "bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+            "max_files": self.max_files,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def _load(self):
+        # 재시작 시 기존 파일을 수정 시각 순으로 다시 등록
+        files = []
+        for file_name in os.listdir(self.directory):
+            file_path = os.path.join(self.directory, file_name)
+            if file_name.endswith(".tmp") or not os.path.isfile(file_path):
+                continue
+            stat = os.stat(file_path)
+            files.append((stat.st_mtime, file_name, stat.st_size))
+
+        for _, file_name, size in sorted(files):
+            self.entries[file_name.split(".", 1)[0]] = (file_name, size)
+            self.total_bytes += size
+        self._evict()
+
+    def _evict(self):
+        while self.entries and (self.total_bytes > self.max_bytes or len(self.entries) > self.max_files):
+            key = next(iter(self.entries))
+            self._remove(key)
+
+    def _remove(self, key: str, delete_file: bool = True):
+        file_name, size = self.entries.pop(key)
+        self.total_bytes -= size
+        if delete_file:
+            try:
+                os.remove(os.path.join(self.directory, file_name))
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.error(f"Error remove tts cache file: {e}")
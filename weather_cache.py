@@ -0,0 +1,159 @@
+import asyncio
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+
+from starlette.concurrency import run_in_threadpool
+
+logger = logging.getLogger(__name__)
+
+
+# 초단기예보는 매시 30분 기준이지만 API 제공은 약 15분 뒤(매시 45분 이후)
+publish_delay = timedelta(minutes=15)
+
+
+def get_ultra_short_base_datetime(now: datetime = None):
+    # API 로 받을 수 있는 가장 최근 발표 시각
+    now = (now or datetime.now()) - publish_delay
+    if now.minute < 30:
+        return now.replace(minute=30, second=0, microsecond=0) - timedelta(hours=1)
+    return now.replace(minute=30, second=0, microsecond=0)
+
+
+def get_next_publish_datetime(now: datetime = None):
+    # 다음 발표분을 API 로 받을 수 있게 되는 시각
+    return get_ultra_short_base_datetime(now) + timedelta(hours=1) + publish_delay
+
+
+def get_ultra_short_base_time(now: datetime = None):
+    last_half_hour = get_ultra_short_base_datetime(now)
+    return last_half_hour.strftime("%Y%m%d"), last_half_hour.strftime("%H%M")
+
+
+class _Flight:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class ForecastCache:
+    """
+    (nx, ny, base_date, base_time) 단위로 기상청 초단기예보를 메모리에 보관하는 캐시
+    같은 키의 동시 요청은 한 번의 외부 호출 결과를 함께 기다린다(single-flight)
+    """
+
+    def __init__(self, loader, wait_timeout: float = 10):
+        self.loader = loader
+        self.wait_timeout = wait_timeout
+        self.entries = {}  # (nx, ny, base_date, base_time) -> 예보
+        self.inflight = {}  # (nx, ny, base_date, base_time) -> _Flight
+        self.requested = {}  # (nx, ny) -> 마지막 요청 시각
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.errors = 0
+        self.lock = threading.Lock()
+
+    def get(self, nx: int, ny: int, base_date: str = None, base_time: str = None, track: bool = True):
+        if not base_date or not base_time:
+            base_date, base_time = get_ultra_short_base_time()
+        key = (nx, ny, base_date, base_time)
+
+        with self.lock:
+            if track:
+                self.requested[(nx, ny)] = time.monotonic()
+            if key in self.entries:
+                self.hits += 1
+                return self.entries[key]
+
+            flight = self.inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self.inflight[key] = flight
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            if not flight.event.wait(self.wait_timeout):
+                raise TimeoutError(f"weather forecast wait timeout: {key}")
+            if flight.error:
+                raise flight.error
+            return flight.result
+
+        try:
+            result = self.loader(*key)
+            with self.lock:
+                self.entries[key] = result
+                self._evict(key)
+            flight.result = result
+            return result
+        except Exception as e:
+            with self.lock:
+                self.errors += 1
+            flight.error = e
+            raise
+        finally:
+            with self.lock:
+                self.inflight.pop(key, None)
+            flight.event.set()
+
+    def get_latest(self, nx: int, ny: int, track: bool = True):
+        # 외부 호출 없이 해당 지점의 가장 최근 발표분 반환 (track 이면 refresh_loop 대상 지점으로 기록)
+        with self.lock:
+            if track:
+                self.requested[(nx, ny)] = time.monotonic()
+            keys = [key for key in self.entries if key[:2] == (nx, ny)]
+            if not keys:
+                return None
+            self.hits += 1
+            return self.entries[max(keys)]
+
+    def recent_points(self, active_seconds: float):
+        with self.lock:
+            now = time.monotonic()
+            return [point for point, requested_at in self.requested.items() if now - requested_at <= active_seconds]
+
+    async def refresh_loop(self, delay_seconds: float = 30, active_seconds: float = 2 * 60 * 60,
+                           retry_seconds: float = 120):
+        # 새 발표분이 API 에 올라오면 최근 요청된 지점의 예보를 미리 받아두고, 실패한 지점은 다음 발표 전까지 재시도
+        while True:
+            next_publish = get_next_publish_datetime()
+            wait_seconds = (next_publish - datetime.now()).total_seconds() + delay_seconds
+            await asyncio.sleep(max(wait_seconds, 1))
+
+            base_date, base_time = get_ultra_short_base_time()
+            points = self.recent_points(active_seconds)
+            next_publish = get_next_publish_datetime()
+            while points:
+                failed = []
+                for nx, ny in points:
+                    try:
+                        await run_in_threadpool(self.get, nx, ny, base_date, base_time, False)
+                    except Exception as e:
+                        failed.append((nx, ny))
+                        logger.error(f"Error refresh weather forecast ({nx}, {ny}): {e}")
+
+                points = failed
+                if not points or datetime.now() + timedelta(seconds=retry_seconds) >= next_publish:
+                    break
+                await asyncio.sleep(retry_seconds)
+
+    def stats(self):
+        with self.lock:
+            return {
+                "entries": len(self.entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "errors": self.errors,
+            }
+
+    def _evict(self, key):
+        # 같은 지점의 이전 발표분은 삭제
+        nx, ny, base_date, base_time = key
+        for old_key in [k for k in self.entries if k[:2] == (nx, ny) and k[2:] < (base_date, base_time)]:
+            del self.entries[old_key]
@@ -0,0 +1,87 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from weather_cache import get_next_publish_datetime, get_ultra_short_base_time
+
+logger = logging.getLogger(__name__)
+
+
+class WeatherPrefetcher:
+    """
+    기상청 발표분이 API 에 올라오는 시각마다 골프장 격자 좌표 전체의 예보를 병렬로 받아 ForecastCache 에 저장
+    실패한 지점은 다음 발표 전까지 retry_seconds 간격으로 다시 받는다
+    points_loader 는 [(nx, ny), ...] 를 반환하는 코루틴 함수
+    """
+
+    def __init__(self, forecast_cache, points_loader, max_workers: int = 8, delay_seconds: float = 30,
+                 retry_seconds: float = 120):
+        self.forecast_cache = forecast_cache
+        self.points_loader = points_loader
+        self.max_workers = max_workers
+        self.delay_seconds = delay_seconds
+        self.retry_seconds = retry_seconds
+        self.retries = 0
+        self.last_base = None
+        self.last_points = 0
+        self.last_errors = 0
+        self.last_elapsed = 0
+
+    def prefetch(self, points):
+        points = sorted(set(points))
+        base_date, base_time = get_ultra_short_base_time()
+
+        started = time.perf_counter()
+        failed = []
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="weather") as executor:
+            futures = {
+                executor.submit(self.forecast_cache.get, nx, ny, base_date, base_time, False): (nx, ny)
+                for nx, ny in points
+            }
+            for future, point in futures.items():
+                try:
+                    future.result()
+                except Exception as e:
+                    failed.append(point)
+                    logger.error(f"Error prefetch weather forecast {point}: {e}")
+
+        self.last_base = f"{base_date}{base_time}"
+        self.last_points = len(points)
+        self.last_errors = len(failed)
+        self.last_elapsed = time.perf_counter() - started
+        logger.info(f"Weather prefetch complete: base={self.last_base}, points={len(points)}, "
+                    f"errors={len(failed)}, {self.last_elapsed * 1000:.0f}ms")
+        return failed
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            next_publish = get_next_publish_datetime()
+            points = None  # None 이면 전체 지점
+            while True:
+                try:
+                    if points is None:
+                        points = await self.points_loader()
+                    points = await loop.run_in_executor(None, self.prefetch, points)
+                except Exception as e:
+                    logger.error(f"Error prefetch weather: {e}")
+
+                # 실패한 지점은 다음 발표 전까지 재시도
+                if not points or datetime.now() + timedelta(seconds=self.retry_seconds) >= next_publish:
+                    break
+                self.retries += 1
+                await asyncio.sleep(self.retry_seconds)
+
+            wait_seconds = (next_publish - datetime.now()).total_seconds() + self.delay_seconds
+            await asyncio.sleep(max(wait_seconds, 1))
+
+    def stats(self):
+        return {
+            "base": self.last_base,
+            "points": self.last_points,
+            "errors": self.last_errors,
+            "retries": self.retries,
+            "elapsed_ms": round(self.last_elapsed * 1000),
+        }